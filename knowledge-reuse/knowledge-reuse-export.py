@@ -1,27 +1,44 @@
 import argparse
+import sys
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import csv
-import time
 import itertools
 import threading
-from datetime import datetime, timedelta
+import html
+from datetime import datetime, timedelta, timezone
 from urllib.parse import urlparse
-from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# orjson parses API responses considerably faster; fall back to the standard library if it's not installed
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 API_V2_CALLS = 0
+API_V2_ANSWER_CALLS = 0  # Answer batch calls, counted apart from the tenure calls above
+API_V2_CALLS_LOCK = threading.Lock()
 
 def loading_animation(stop_event, message):
     spinner = itertools.cycle(['|', '/', '-', '\\'])
     while not stop_event.is_set():
         print(f"\r{message} {next(spinner)}", end='', flush=True)
-        time.sleep(0.2)
+        # Waiting on the event lets join() return as soon as the phase ends
+        stop_event.wait(1.0)
         
 def forceAPIV3(user_input_url):
     parsed_url = urlparse(user_input_url.strip())
     base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
     return f"{base_url}/api/v3"
 
+def forceAPIV2(user_input_url):
+    parsed_url = urlparse(user_input_url.strip())
+    base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+    return f"{base_url}/api/2.3"
+
 def get_date_range(time_filter):
     """Generate from/to dates based on the selected time filter"""
     today = datetime.now()
@@ -49,6 +66,7 @@ parser = argparse.ArgumentParser(description="Export questions from Stack Overfl
 parser.add_argument("--base-url", required=True, help="Stack Overflow Enterprise Base URL (e.g., https://your-instance.stackoverflow.com)")
 parser.add_argument("--token", required=True, help="Access token for authentication")
 parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output")
+parser.add_argument("--no-progress", action="store_true", help="Disable the progress spinner (it is always off when output is not a terminal)")
 parser.add_argument("--threads", "-t", type=int, default=10, help="Number of concurrent threads for API calls")
 parser.add_argument("--filter", choices=["month", "quarter", "year", "custom"], default="quarter", 
                     help="Time filter for questions (last month, last quarter, last year or custom dates)")
@@ -57,11 +75,41 @@ parser.add_argument("--to-date", help="End date for custom filter (format: YYYY-
 args = parser.parse_args()
 
 BASE_URL = forceAPIV3(args.base_url)
+BASE_DOMAIN_V2 = forceAPIV2(args.base_url)
 ACCESS_TOKEN = args.token
 HEADERS = { "Authorization": f"Bearer {ACCESS_TOKEN}"}
 VERBOSE = args.verbose
+# The spinner only makes sense on an interactive terminal and is redundant with verbose logs
+SHOW_PROGRESS = not VERBOSE and not args.no_progress and sys.stdout.isatty()
 MAX_THREADS = args.threads
 
+# Past ~20 concurrent requests the API starts throttling, which lowers overall throughput
+THREAD_LIMIT = 20
+if MAX_THREADS > THREAD_LIMIT:
+    print(f"Warning: --threads={MAX_THREADS} exceeds the limit of {THREAD_LIMIT}; using {THREAD_LIMIT} threads")
+    MAX_THREADS = THREAD_LIMIT
+
+# Shared session so every API call reuses pooled keep-alive connections.
+# pool_block makes a thread wait for a free pooled connection instead of opening (and then
+# discarding) an extra one, so no request pays for a fresh TCP+TLS handshake once the pool is warm.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+_adapter = HTTPAdapter(
+    pool_connections=MAX_THREADS,
+    pool_maxsize=MAX_THREADS,
+    pool_block=True,
+    max_retries=Retry(
+        total=5,
+        backoff_factor=1.0,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=True
+    )
+)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+REQUEST_TIMEOUT = (5, 30)
+
 # Get date range based on filter
 if args.filter == "custom" and (not args.from_date or not args.to_date):
     print("Error: --from-date and --to-date are required when using --filter=custom")
@@ -73,11 +121,70 @@ if args.filter == "custom":
 else:
     FROM_DATE, TO_DATE = get_date_range(args.filter)
 
+class LRUCache(OrderedDict):
+    """Dict that evicts its least recently used entry once it grows past maxsize (None means unbounded)"""
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self.lock = threading.RLock()
+        self.key_locks = {}
+        super().__init__()
+    
+    def __getitem__(self, key):
+        with self.lock:
+            value = super().__getitem__(key)
+            self.move_to_end(key)
+            return value
+    
+    def __setitem__(self, key, value):
+        with self.lock:
+            if key in self:
+                self.move_to_end(key)
+            super().__setitem__(key, value)
+            if self.maxsize is not None and len(self) > self.maxsize:
+                del self[next(iter(self))]
+    
+    def get(self, key, default=None):
+        with self.lock:
+            return self[key] if key in self else default
+    
+    def get_or_create(self, key, loader):
+        """Return the cached value for key, calling loader(key) at most once at a time across threads"""
+        with self.lock:
+            if key in self:
+                return self[key]
+            # [lock, number of threads using it], so the lock is only dropped once the last of them is done
+            key_lock = self.key_locks.setdefault(key, [threading.Lock(), 0])
+            key_lock[1] += 1
+        
+        try:
+            with key_lock[0]:
+                # Another thread may have loaded the key while we waited; if its loader raised, we try again
+                with self.lock:
+                    if key in self:
+                        return self[key]
+                value = loader(key)
+                self[key] = value
+                return value
+        finally:
+            with self.lock:
+                key_lock[1] -= 1
+                if not key_lock[1]:
+                    del self.key_locks[key]
+
+# Only a safety net: no realistic instance has this many tags, so in practice the cache never evicts
+# and memory isn't meaningfully capped by it
+CACHE_MAX_SIZE = 50000
+
 # Cache for SME data to avoid redundant API calls
-TAG_SME_CACHE = {}
+TAG_SME_CACHE = LRUCache(CACHE_MAX_SIZE)
 USER_SME_CACHE = defaultdict(set)
-USER_DATA_CACHE = {}  # Cache for user data (department, jobTitle)
-ANSWER_CACHE = {}  # Cache for accepted answers
+USER_SME_CACHE_LOCK = threading.Lock()
+# The CSV writer reads user data and accepted answers back from these, so they are never evicted during a run
+USER_DATA_CACHE = LRUCache()  # Cache for user data (department, jobTitle)
+ANSWER_CACHE = LRUCache()  # Cache for accepted answers
+
+CSV_BUFFER_SIZE = 1 << 20  # 1MB write buffer for the export file
+CSV_BATCH_SIZE = 1000  # Rows accumulated before each writerows call
 
 def log(message):
     """Print log message if verbose mode is enabled"""
@@ -85,83 +192,130 @@ def log(message):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         print(f"[{timestamp}] {message}")
 
-def get_questions():
-    questions = []
-    page = 1
-    total_pages = None
+def fetch_questions_page(page):
+    """Fetch a single page of questions, with optional date filtering"""
+    url = f"{BASE_URL}/questions?page={page}&pageSize=100"
+    if FROM_DATE and TO_DATE:
+        url += f"&from={FROM_DATE}&to={TO_DATE}"
     
+    try:
+        response = SESSION.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return json_loads(response.content)
+    except requests.exceptions.RequestException as e:
+        log(f"Error fetching page {page}: {str(e)}")
+        raise
+
+def get_questions():
     filter_message = ""
     if FROM_DATE and TO_DATE:
         filter_message = f" with date filter from {FROM_DATE} to {TO_DATE}"
     
     log(f"Starting to fetch questions from {BASE_URL}{filter_message}")
     
-    while True:
-        # Build the URL with optional date filtering
-        url = f"{BASE_URL}/questions?page={page}&pageSize=100"
-        if FROM_DATE and TO_DATE:
-            url += f"&from={FROM_DATE}&to={TO_DATE}"
-            
-        log(f"Fetching page {page}/{total_pages or '?'} of questions")
-        
-        try:
-            response = requests.get(url, headers=HEADERS)
-            response.raise_for_status()
-            data = response.json()
-            
-            items = data.get("items", [])
-            questions.extend(items)
-            
-            if total_pages is None:
-                total_pages = data.get("totalPages", 1)
-                log(f"Total pages to fetch: {total_pages}")
-            
-            log(f"Retrieved {len(items)} questions from page {page}/{total_pages}")
-            
-            if page >= total_pages:
-                log(f"All pages fetched. Total questions: {len(questions)}")
-                break
-            
-            page += 1
+    # The first page tells us how many pages there are in total
+    log("Fetching page 1/? of questions")
+    data = fetch_questions_page(1)
+    total_pages = data.get("totalPages", 1)
+    log(f"Total pages to fetch: {total_pages}")
+    
+    pages = {1: data.get("items", [])}
+    log(f"Retrieved {len(pages[1])} questions from page 1/{total_pages}")
+    
+    # Remaining pages are independent, so fetch them all concurrently
+    if total_pages > 1:
+        with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
+            futures = {executor.submit(fetch_questions_page, page): page for page in range(2, total_pages + 1)}
             
-        except requests.exceptions.RequestException as e:
-            log(f"Error fetching page {page}: {str(e)}")
-            raise
-        
+            for future in as_completed(futures):
+                page = futures[future]
+                pages[page] = future.result().get("items", [])
+                log(f"Retrieved {len(pages[page])} questions from page {page}/{total_pages}")
+    
+    # Keep the API's ordering regardless of the order pages arrived in
+    questions = [question for page in sorted(pages) for question in pages[page]]
+    log(f"All pages fetched. Total questions: {len(questions)}")
+    
     return questions
 
-def get_accepted_answer(question_id):
-    # Check cache first
-    if question_id in ANSWER_CACHE:
-        log(f"Using cached answer for question ID: {question_id}")
-        return ANSWER_CACHE[question_id]
-        
+def fetch_accepted_answer(question_id):
     url = f"{BASE_URL}/questions/{question_id}/answers"
     log(f"Fetching answers for question ID: {question_id}")
     
     try:
-        response = requests.get(url, headers=HEADERS)
+        response = SESSION.get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        answers = response.json().get("items", [])
+        answers = json_loads(response.content).get("items", [])
         
         log(f"Retrieved {len(answers)} answers for question ID: {question_id}")
         
         for answer in answers:
             if answer.get("isAccepted", False):
                 log(f"Found accepted answer ID: {answer.get('id')} for question ID: {question_id}")
-                # Store in cache
-                ANSWER_CACHE[question_id] = answer
                 return answer
         
         log(f"No accepted answer found for question ID: {question_id}")
         # Cache negative result too
-        ANSWER_CACHE[question_id] = None
         return None
         
     except requests.exceptions.RequestException as e:
         log(f"Error fetching answers for question {question_id}: {str(e)}")
-        ANSWER_CACHE[question_id] = None  # Cache the error case
-        return None
+        return None  # Cache the error case
+
+def get_accepted_answer(question_id):
+    return ANSWER_CACHE.get_or_create(question_id, fetch_accepted_answer)
+
+def normalize_v2_answer(answer):
+    """Map a v2.3 answer item onto the v3 fields and value formats used by the CSV export"""
+    owner = answer.get("owner", {}) or {}
+    creation_date = answer.get("creation_date")
+    user_type = owner.get("user_type")
+    return {
+        "id": answer.get("answer_id"),
+        "questionId": answer.get("question_id"),
+        "isAccepted": answer.get("is_accepted", False),
+        "score": answer.get("score"),
+        # v3 dates carry milliseconds and no zone suffix (e.g. 2024-01-03T17:21:01.323); v2.3 has whole seconds
+        "creationDate": datetime.fromtimestamp(creation_date, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000") if creation_date else None,
+        "owner": {
+            "id": owner.get("user_id"),
+            "name": html.unescape(owner["display_name"]) if owner.get("display_name") else None,
+            # v2.3 user_type is the lowercase form of the v3 role (registered -> Registered)
+            "role": user_type.title() if user_type else None
+        }
+    }
+
+def get_accepted_answers_batch(question_ids):
+    """Fetch accepted answers for up to 100 questions with a single paginated v2.3 call"""
+    global API_V2_ANSWER_CALLS
+    
+    ids_string = ";".join(map(str, question_ids))
+    log(f"Batch fetching answers from v2.3 API for {len(question_ids)} questions")
+    
+    # Default every question to "no accepted answer" so negative results are cached too
+    accepted = dict.fromkeys(question_ids)
+    page = 1
+    
+    while True:
+        v2_url = f"{BASE_DOMAIN_V2}/questions/{ids_string}/answers?order=desc&sort=activity&pagesize=100&page={page}"
+        with API_V2_CALLS_LOCK:
+            API_V2_ANSWER_CALLS += 1
+        
+        response = SESSION.get(v2_url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        data = json_loads(response.content)
+        
+        for item in data.get("items", []):
+            if item.get("is_accepted") and item.get("question_id") in accepted:
+                accepted[item["question_id"]] = normalize_v2_answer(item)
+        
+        if not data.get("has_more"):
+            break
+        page += 1
+    
+    ANSWER_CACHE.update(accepted)
+    log(f"Found {sum(1 for a in accepted.values() if a)} accepted answers for {len(question_ids)} questions")
+    return accepted
 
 def preload_answers(questions):
     """Preload accepted answers for answered questions in parallel"""
@@ -177,52 +331,50 @@ def preload_answers(questions):
     loading_message = f"Preloading accepted answers for {total_answered} questions..."
     loading_thread = threading.Thread(target=loading_animation, args=(stop_event, loading_message))
     
-    if not VERBOSE:
+    if SHOW_PROGRESS:
         loading_thread.start()
     
     try:
         with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
-            # Submit all question API calls to the thread pool
-            futures = {executor.submit(get_accepted_answer, qid): qid for qid in answered_questions}
+            # Submit batches of 100 question IDs to the thread pool
+            batches = [answered_questions[i:i + 100] for i in range(0, total_answered, 100)]
+            futures = {executor.submit(get_accepted_answers_batch, batch): batch for batch in batches}
             
             # Process results as they complete
             completed = 0
-            for future in futures:
+            fallback_ids = []
+            for future in as_completed(futures):
+                batch = futures[future]
                 try:
-                    answer = future.result()  # This ensures any exceptions are raised
-                    qid = futures[future]
-                    ANSWER_CACHE[qid] = answer  # Store in cache (even if None)
-                    completed += 1
-                    if VERBOSE and completed % 50 == 0:
+                    future.result()  # This ensures any exceptions are raised
+                    if VERBOSE:
+                        completed += len(batch)
                         log(f"Preloaded {completed}/{total_answered} answers")
                 except Exception as e:
-                    qid = futures[future]
-                    log(f"Error preloading answer for question {qid}: {str(e)}")
-                    ANSWER_CACHE[qid] = None  # Cache the error case
+                    log(f"Error batch preloading answers, falling back to per-question calls: {str(e)}")
+                    fallback_ids.extend(batch)
+            
+            # Questions from failed batches are looked up one by one, still in parallel
+            fallback_futures = {executor.submit(get_accepted_answer, qid): qid for qid in fallback_ids}
+            for future in as_completed(fallback_futures):
+                future.result()
             
         log(f"Preloaded {len(ANSWER_CACHE)} accepted answers")
         
     finally:
         stop_event.set()
-        if not VERBOSE:
+        if SHOW_PROGRESS:
             loading_thread.join()
+        if not VERBOSE:
             print("\rAccepted answer preloading complete!        ")
 
 def calculate_user_tenure(joined_date, last_seen_date):
     if joined_date and last_seen_date:
-        return (datetime.fromtimestamp(last_seen_date) - datetime.fromtimestamp(joined_date))
+        return timedelta(seconds=last_seen_date - joined_date)
     return None
 
-def get_user_data(user_id):
+def fetch_user_data(user_id):
     """Fetch additional user data from API v3 endpoint, including user info but not tenure"""
-    # Check cache first
-    if user_id in USER_DATA_CACHE:
-        log(f"Using cached user data for user ID: {user_id}")
-        return USER_DATA_CACHE[user_id]
-    
-    if not user_id:
-        return {"department": None, "jobTitle": None, "tenure": None}
-    
     # Call v3 API for department and job title
     v3_url = f"{BASE_URL}/users/{user_id}"
     log(f"Fetching user data from v3 API for user ID: {user_id}")
@@ -230,154 +382,171 @@ def get_user_data(user_id):
     user_data = {"department": None, "jobTitle": None, "tenure": None}
     
     try:
-        v3_response = requests.get(v3_url, headers=HEADERS)
+        v3_response = SESSION.get(v3_url, timeout=REQUEST_TIMEOUT)
         v3_response.raise_for_status()
         
-        v3_data = v3_response.json()
+        v3_data = json_loads(v3_response.content)
         user_data.update({
             "department": v3_data.get("department"),
             "jobTitle": v3_data.get("jobTitle")
         })
         
         # Tenure data will be fetched separately in batches
-        
-        # Update cache
-        USER_DATA_CACHE[user_id] = user_data
         log(f"Retrieved user data for user ID: {user_id}")
         
-        return user_data
-        
     except requests.exceptions.RequestException as e:
         log(f"Error fetching user data for user ID {user_id}: {str(e)}")
         # Cache empty result to avoid repeated failed calls
-        USER_DATA_CACHE[user_id] = user_data
-        return user_data
+    
+    return user_data
 
-def get_batch_tenure_data(user_ids, batch_size=10):
-    """Fetch tenure data for multiple users in a single API call"""
+def get_user_data(user_id):
+    if not user_id:
+        return {"department": None, "jobTitle": None, "tenure": None}
+    
+    return USER_DATA_CACHE.get_or_create(user_id, fetch_user_data)
+
+def fetch_users_page(page):
+    """Fetch a single page of the v3 user list"""
+    response = SESSION.get(f"{BASE_URL}/users?page={page}&pageSize=100", timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return json_loads(response.content)
+
+def get_user_data_bulk(user_ids, executor):
+    """Fill the user data cache from the v3 user list when that takes fewer calls than per-user lookups"""
+    loaded = set()
+    
+    try:
+        first_page = fetch_users_page(1)
+    except requests.exceptions.RequestException as e:
+        log(f"Error fetching user list, falling back to per-user calls: {str(e)}")
+        return loaded
+    
+    total_pages = first_page.get("totalPages", 1)
+    if total_pages >= len(user_ids):
+        log(f"User list spans {total_pages} pages for {len(user_ids)} users, using per-user calls instead")
+        return loaded
+    
+    log(f"Fetching {total_pages} pages of the user list for {len(user_ids)} users")
+    
+    def collect(page_data):
+        for item in page_data.get("items", []):
+            user_id = item.get("id")
+            # Only trust list entries that actually carry the fields we export
+            if user_id in user_ids and "department" in item and "jobTitle" in item:
+                USER_DATA_CACHE[user_id] = {"department": item["department"], "jobTitle": item["jobTitle"], "tenure": None}
+                loaded.add(user_id)
+    
+    collect(first_page)
+    
+    futures = {executor.submit(fetch_users_page, page): page for page in range(2, total_pages + 1)}
+    for future in as_completed(futures):
+        try:
+            collect(future.result())
+        except requests.exceptions.RequestException as e:
+            log(f"Error fetching user list page {futures[future]}: {str(e)}")
+    
+    log(f"Loaded {len(loaded)}/{len(user_ids)} users from the user list")
+    return loaded
+
+def fetch_tenure_batch(v2_url, batch_len):
+    """Fetch tenure data for one batch of users, returned as a user ID -> tenure dict"""
     global API_V2_CALLS
     
-    if not user_ids:
-        return
-        
-    # Parse the base URL to get the domain for v2.3 API
-    parsed_url = urlparse(args.base_url.strip())
-    base_domain = f"{parsed_url.scheme}://{parsed_url.netloc}"
+    log(f"Batch fetching tenure data from v2.3 API for {batch_len} users")
     
-    # Process users in batches
-    for i in range(0, len(user_ids), batch_size):
-        batch = user_ids[i:i + batch_size]
-        
-        # Convert batch to semicolon-separated string
-        ids_string = ";".join(map(str, batch))
-        
-        # Call v2.3 API with batched IDs
-        v2_url = f"{base_domain}/api/2.3/users/{ids_string}?order=desc&sort=reputation"
-        log(f"Batch fetching tenure data from v2.3 API for {len(batch)} users")
-        
-        # Increment API call counter
+    # Increment API call counter
+    with API_V2_CALLS_LOCK:
         API_V2_CALLS += 1
+    
+    tenures = {}
+    
+    try:
+        v2_response = SESSION.get(v2_url, timeout=REQUEST_TIMEOUT)
+        v2_response.raise_for_status()
         
-        try:
-            v2_response = requests.get(v2_url, headers=HEADERS)
-            v2_response.raise_for_status()
+        v2_data = json_loads(v2_response.content)
+        
+        for user_item in v2_data.get("items", []):
+            user_id = user_item.get("user_id")
+            if not user_id:
+                continue
+                
+            creation_date = user_item.get("creation_date")
+            last_access_date = user_item.get("last_access_date")
             
-            v2_data = v2_response.json()
+            # Calculate user tenure
+            tenures[user_id] = calculate_user_tenure(creation_date, last_access_date)
             
-            if "items" in v2_data:
-                for user_item in v2_data["items"]:
-                    user_id = user_item.get("user_id")
-                    if not user_id or user_id not in USER_DATA_CACHE:
-                        continue
-                        
-                    creation_date = user_item.get("creation_date")
-                    last_access_date = user_item.get("last_access_date")
-                    
-                    # Calculate user tenure
-                    tenure = calculate_user_tenure(creation_date, last_access_date)
-                    
-                    # Update the existing cache entry with tenure
-                    USER_DATA_CACHE[user_id]["tenure"] = tenure
-                    
-                    log(f"Retrieved tenure data for user ID: {user_id}")
-            
-        except requests.exceptions.RequestException as e:
-            log(f"Error batch fetching tenure data: {str(e)}")
+            log(f"Retrieved tenure data for user ID: {user_id}")
+        
+    except requests.exceptions.RequestException as e:
+        log(f"Error batch fetching tenure data: {str(e)}")
     
-def get_smes_for_tag(tag_id):
-    # Check cache first
-    if tag_id in TAG_SME_CACHE:
-        log(f"Using cached SME data for tag ID: {tag_id}")
-        return TAG_SME_CACHE[tag_id]
+    return tenures
+
+def submit_tenure_batches(executor, user_ids, batch_size=100):
+    """Submit one v2.3 tenure call per batch of users to the executor, returning the futures"""
+    # Build one semicolon-separated v2.3 URL per batch of users
+    batches = []
+    ids_iter = iter(user_ids)
+    for batch in iter(lambda: list(itertools.islice(ids_iter, batch_size)), []):
+        ids_string = ";".join(map(str, batch))
+        batches.append((f"{BASE_DOMAIN_V2}/users/{ids_string}?order=desc&sort=reputation&pagesize={batch_size}", len(batch)))
     
+    return [executor.submit(fetch_tenure_batch, v2_url, batch_len) for v2_url, batch_len in batches]
+
+def fetch_smes_for_tag(tag_id):
     url = f"{BASE_URL}/tags/{tag_id}/subject-matter-experts"
     log(f"Fetching SMEs for tag ID: {tag_id}")
     
     try:
-        response = requests.get(url, headers=HEADERS)
+        response = SESSION.get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         
-        data = response.json()
+        data = json_loads(response.content)
         sme_users = {user.get('id') for user in data.get('users', [])}
         
-        # Update cache
-        TAG_SME_CACHE[tag_id] = sme_users
-        
         # Update user-tag cache for faster lookups
-        for user_id in sme_users:
-            USER_SME_CACHE[user_id].add(tag_id)
+        with USER_SME_CACHE_LOCK:
+            for user_id in sme_users:
+                USER_SME_CACHE[user_id].add(tag_id)
         
         log(f"Found {len(sme_users)} SMEs for tag ID: {tag_id}")
         return sme_users
         
     except requests.exceptions.RequestException as e:
         log(f"Error fetching SMEs for tag {tag_id}: {str(e)}")
-        TAG_SME_CACHE[tag_id] = set()  # Cache empty result to avoid repeated failed calls
-        return set()
-
-def check_tag_sme(user_id, tag_id):
-    """Check if a user is an SME for a specific tag"""
-    # Get SMEs for this tag (will use cache if available)
-    smes = get_smes_for_tag(tag_id)
-    return user_id in smes
-
-def is_sme(user_id, question_tags):
-    if not user_id or not question_tags:
-        return False
-    
-    # Check if we already know this user is an SME for any tag (fast cache check)
-    if user_id in USER_SME_CACHE:
-        tag_ids = {tag.get('id') for tag in question_tags if 'id' in tag}
-        if any(tag_id in USER_SME_CACHE[user_id] for tag_id in tag_ids):
-            log(f"User ID {user_id} is an SME (from cache)")
-            return True
-    
-    log(f"Checking if user ID {user_id} is SME for any of {len(question_tags)} tags")
-    
-    # Get valid tag IDs from question tags
-    tag_ids = [tag.get('id') for tag in question_tags if 'id' in tag]
-    
-    # Check tags in parallel
-    with ThreadPoolExecutor(max_workers=min(MAX_THREADS, len(tag_ids))) as executor:
-        # Create a future for each tag check
-        future_to_tag = {
-            executor.submit(check_tag_sme, user_id, tag_id): tag_id 
-            for tag_id in tag_ids
-        }
+        return set()  # Cache empty result to avoid repeated failed calls
+
+def get_smes_for_tag(tag_id):
+    return TAG_SME_CACHE.get_or_create(tag_id, fetch_smes_for_tag)
+
+def is_sme(user_id, tag_ids):
+    """Check if a user is an SME for any of the given tag IDs (a frozenset), using data from preload_sme_data"""
+    # USER_SME_CACHE maps each user to the tags they are an SME for
+    user_tags = USER_SME_CACHE.get(user_id)
+    return bool(user_tags and tag_ids and (user_tags & tag_ids))
+
+def get_question_sme_flags(questions):
+    """Work out, in one pass, whether each question's owner and accepted answer owner are SMEs for its tags"""
+    sme_flags = {}
+    
+    for question in questions:
+        tags = question.get("tags", [])
+        tag_id_set = frozenset(tag["id"] for tag in tags if "id" in tag)
         
-        # As each future completes, check if the user is an SME
-        for future in future_to_tag:
-            tag_id = future_to_tag[future]
-            try:
-                is_sme_for_tag = future.result()
-                if is_sme_for_tag:
-                    log(f"User ID {user_id} is an SME for tag {tag_id}")
-                    return True
-            except Exception as e:
-                log(f"Error checking SME status for tag {tag_id}: {str(e)}")
-    
-    log(f"User ID {user_id} is not an SME for these tags")
-    return False
+        owner_id = (question.get("owner", {}) or {}).get("id")
+        
+        answer_owner_id = None
+        if question.get("isAnswered"):
+            accepted_answer = ANSWER_CACHE.get(question.get("id"))
+            if accepted_answer:
+                answer_owner_id = (accepted_answer.get("owner", {}) or {}).get("id")
+        
+        sme_flags[question.get("id")] = (is_sme(owner_id, tag_id_set), is_sme(answer_owner_id, tag_id_set))
+    
+    return sme_flags
 
 def preload_sme_data(questions):
     """Preload SME data for all tags in all questions to avoid repeated API calls"""
@@ -399,31 +568,33 @@ def preload_sme_data(questions):
     loading_message = f"Preloading SME data for {len(all_tags)} tags..."
     loading_thread = threading.Thread(target=loading_animation, args=(stop_event, loading_message))
     
-    if not VERBOSE:
+    if SHOW_PROGRESS:
         loading_thread.start()
     
     try:
         with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
             # Submit all tag API calls to the thread pool
-            futures = [executor.submit(get_smes_for_tag, tag_id) for tag_id in all_tags]
+            futures = {executor.submit(get_smes_for_tag, tag_id): tag_id for tag_id in all_tags}
             
             # Process results as they complete
             completed = 0
-            for future in futures:
+            for future in as_completed(futures):
                 try:
                     future.result()  # This ensures any exceptions are raised
-                    completed += 1
-                    if VERBOSE and completed % 10 == 0:
-                        log(f"Preloaded {completed}/{len(all_tags)} tags")
+                    if VERBOSE:
+                        completed += 1
+                        if completed % 10 == 0:
+                            log(f"Preloaded {completed}/{len(all_tags)} tags")
                 except Exception as e:
-                    log(f"Error preloading tag: {str(e)}")
+                    log(f"Error preloading tag {futures[future]}: {str(e)}")
             
         log(f"Preloaded SME data for {len(TAG_SME_CACHE)} tags")
         
     finally:
         stop_event.set()
-        if not VERBOSE:
+        if SHOW_PROGRESS:
             loading_thread.join()
+        if not VERBOSE:
             print("\rSME data preloading complete!        ")
 
 def preload_user_data(questions):
@@ -458,65 +629,66 @@ def preload_user_data(questions):
     
     log(f"Found {len(user_ids)} unique users")
     
-    # First, fetch basic user data from v3 API
+    # Basic data (v3) and tenure (v2.3) come from different endpoints, so fetch them at the same time
+    batch_size = 100
+    total_batches = (len(user_ids) + batch_size - 1) // batch_size
+    
     stop_event = threading.Event()
-    loading_message = f"Preloading basic user data for {len(user_ids)} users..."
+    loading_message = f"Preloading user data for {len(user_ids)} users ({total_batches} tenure batches)..."
     loading_thread = threading.Thread(target=loading_animation, args=(stop_event, loading_message))
     
-    if not VERBOSE:
+    if SHOW_PROGRESS:
         loading_thread.start()
     
     try:
+        # One pool serves both passes so the whole phase stays within MAX_THREADS requests
         with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
-            # Submit all user API calls to the thread pool for basic data
-            futures = [executor.submit(get_user_data, user_id) for user_id in user_ids]
+            # Queue the tenure batches first; they run while the basic data is being fetched
+            tenure_futures = submit_tenure_batches(executor, list(user_ids), batch_size)
+            
+            # Page through the user list in bulk if cheaper, then look up whoever is left individually
+            remaining_user_ids = user_ids - get_user_data_bulk(user_ids, executor)
+            
+            # Submit remaining user API calls to the thread pool for basic data
+            futures = {executor.submit(get_user_data, user_id): user_id for user_id in remaining_user_ids}
             
             # Process results as they complete
             completed = 0
-            for future in futures:
+            for future in as_completed(futures):
                 try:
                     future.result()  # This ensures any exceptions are raised
-                    completed += 1
-                    if VERBOSE and completed % 50 == 0:
-                        log(f"Preloaded basic data for {completed}/{len(user_ids)} users")
+                    if VERBOSE:
+                        completed += 1
+                        if completed % 50 == 0:
+                            log(f"Preloaded basic data for {completed}/{len(remaining_user_ids)} users")
                 except Exception as e:
-                    log(f"Error preloading user data: {str(e)}")
+                    log(f"Error preloading user data for user ID {futures[future]}: {str(e)}")
             
-        log(f"Preloaded basic user data for {len(USER_DATA_CACHE)} users")
-        
-    finally:
-        stop_event.set()
-        if not VERBOSE:
-            loading_thread.join()
-            print("\rBasic user data preloading complete!        ")
-    
-    # Now, fetch tenure data in batches
-    user_ids_list = list(user_ids)
-    batch_size = 10
-    total_batches = (len(user_ids_list) + batch_size - 1) // batch_size
-    
-    stop_event = threading.Event()
-    loading_message = f"Preloading tenure data for {len(user_ids)} users in {total_batches} batches..."
-    loading_thread = threading.Thread(target=loading_animation, args=(stop_event, loading_message))
-    
-    if not VERBOSE:
-        loading_thread.start()
-    
-    try:
-        # Process users in batches to get tenure data
-        get_batch_tenure_data(user_ids_list, batch_size)
+            log(f"Preloaded basic user data for {len(USER_DATA_CACHE)} users")
+            
+            tenures = {}
+            for future in as_completed(tenure_futures):
+                tenures.update(future.result())
+        
+        # Merge tenure into the basic user data now that both are in
+        with USER_DATA_CACHE.lock:
+            for user_id, tenure in tenures.items():
+                if user_id in USER_DATA_CACHE:
+                    USER_DATA_CACHE[user_id]["tenure"] = tenure
         
         log(f"Preloaded tenure data with {API_V2_CALLS} API calls")
         
     finally:
         stop_event.set()
-        if not VERBOSE:
+        if SHOW_PROGRESS:
             loading_thread.join()
-            print("\rTenure data preloading complete!        ")
+        if not VERBOSE:
+            print("\rUser data preloading complete!        ")
 
 def export_to_csv():
-    global API_V2_CALLS
+    global API_V2_CALLS, API_V2_ANSWER_CALLS
     API_V2_CALLS = 0
+    API_V2_ANSWER_CALLS = 0
     
     start_time = datetime.now()
     
@@ -527,15 +699,16 @@ def export_to_csv():
     loading_message = "Fetching questions..."
     loading_thread = threading.Thread(target=loading_animation, args=(stop_event, loading_message))
     
-    if not VERBOSE:
+    if SHOW_PROGRESS:
         loading_thread.start()
     
     try:
         questions = get_questions()
     finally:
         stop_event.set()
-        if not VERBOSE:
+        if SHOW_PROGRESS:
             loading_thread.join()
+        if not VERBOSE:
             print("\rQuestion retrieval complete!        ")
     
     # Preload all SME data to improve performance
@@ -551,19 +724,22 @@ def export_to_csv():
         date_part = f"_{FROM_DATE}_to_{TO_DATE}"
         
     csv_filename = f"knowledge_reuse_export{date_part}.csv"
+    
+    # SME status only depends on the preloaded caches, so resolve it before writing
+    sme_flags = get_question_sme_flags(questions)
+    
     log(f"Writing {len(questions)} questions to {csv_filename}")
     
     stop_event = threading.Event()
     loading_message = f"Writing data to {csv_filename}..."
     loading_thread = threading.Thread(target=loading_animation, args=(stop_event, loading_message))
     
-    if not VERBOSE:
+    if SHOW_PROGRESS:
         loading_thread.start()
     
     try: 
-        with open(csv_filename, mode="w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow([
+        with open(csv_filename, mode="w", newline="", encoding="utf-8", buffering=CSV_BUFFER_SIZE) as f:
+            writer = csv.DictWriter(f, fieldnames=[
                 "tags", "owner.account_id", "owner.user_type", "owner.display_name", "is_answered", "has_accepted",
                 "view_count", "up_vote_count", "creation_date", "question_id", "share_link", "link", "title",
                 "is_SME", "status", "department", "job_title", "user_tenure",
@@ -571,7 +747,10 @@ def export_to_csv():
                 "acc_answer_up_vote_count", "acc_answer_creation_date", "acc_answer_id",
                 "acc_answer_is_SME", "acc_answer_department", "acc_answer_job_title", "acc_answer_user_tenure"
             ])
+            writer.writeheader()
             
+            # Rows are written in batches to cut per-row call and write overhead
+            batch = []
             total_questions = len(questions)
             for i, question in enumerate(questions, 1):
                 if i % 10 == 0 or i == 1 or i == total_questions:
@@ -597,32 +776,28 @@ def export_to_csv():
                 
                 tags = question.get("tags", [])
                 tag_names = [tag["name"] for tag in tags if "name" in tag]
+                is_owner_sme, is_answer_owner_sme = sme_flags[question.get("id")]
                 
-                # Check if question owner is SME (should be fast with preloaded data)
-                is_owner_sme = False
-                if owner_id:
-                    is_owner_sme = is_sme(owner_id, tags)
-                
-                row = [
-                    ",".join(tag_names),
-                    owner_id,
-                    owner.get("role"),
-                    owner.get("name"),
-                    question.get("isAnswered"),
-                    "TRUE" if accepted_answer else "FALSE", 
-                    question.get("viewCount"),
-                    question.get("score"),
-                    question.get("creationDate"),
-                    question.get("id"),
-                    question.get("shareUrl"),
-                    question.get("webUrl"),
-                    question.get("title"),
-                    is_owner_sme,
-                    "Closed" if question.get("isClosed") else "Obsolete" if question.get("isObsolete") else "Deleted" if question.get("isDeleted") else "Open",
-                    owner_data.get("department"),
-                    owner_data.get("jobTitle"),
-                    owner_data.get("tenure")
-                ]
+                row = {
+                    "tags": ",".join(tag_names),
+                    "owner.account_id": owner_id,
+                    "owner.user_type": owner.get("role"),
+                    "owner.display_name": owner.get("name"),
+                    "is_answered": question.get("isAnswered"),
+                    "has_accepted": "TRUE" if accepted_answer else "FALSE", 
+                    "view_count": question.get("viewCount"),
+                    "up_vote_count": question.get("score"),
+                    "creation_date": question.get("creationDate"),
+                    "question_id": question.get("id"),
+                    "share_link": question.get("shareUrl"),
+                    "link": question.get("webUrl"),
+                    "title": question.get("title"),
+                    "is_SME": is_owner_sme,
+                    "status": "Closed" if question.get("isClosed") else "Obsolete" if question.get("isObsolete") else "Deleted" if question.get("isDeleted") else "Open",
+                    "department": owner_data.get("department"),
+                    "job_title": owner_data.get("jobTitle"),
+                    "user_tenure": owner_data.get("tenure")
+                }
                 
                 if accepted_answer:
                     answer_owner = accepted_answer.get("owner", {}) or {}
@@ -633,31 +808,31 @@ def export_to_csv():
                     if answer_owner_id:
                         answer_owner_data = get_user_data(answer_owner_id)
                     
-                    # Check if answer owner is SME (should be fast with preloaded data)
-                    is_answer_owner_sme = False
-                    if answer_owner_id:
-                        is_answer_owner_sme = is_sme(answer_owner_id, tags)
-                    
-                    row.extend([
-                        answer_owner_id,
-                        answer_owner.get("role"),
-                        answer_owner.get("name"),
-                        accepted_answer.get("score"),
-                        accepted_answer.get("creationDate"),
-                        accepted_answer.get("id"),
-                        is_answer_owner_sme,
-                        answer_owner_data.get("department"),
-                        answer_owner_data.get("jobTitle"),
-                        answer_owner_data.get("tenure")
-                    ])
-                else:
-                    row.extend([None] * 10)
+                    row.update({
+                        "acc_answer_owner_id": answer_owner_id,
+                        "acc_answer_user_type": answer_owner.get("role"),
+                        "acc_answer_display_name": answer_owner.get("name"),
+                        "acc_answer_up_vote_count": accepted_answer.get("score"),
+                        "acc_answer_creation_date": accepted_answer.get("creationDate"),
+                        "acc_answer_id": accepted_answer.get("id"),
+                        "acc_answer_is_SME": is_answer_owner_sme,
+                        "acc_answer_department": answer_owner_data.get("department"),
+                        "acc_answer_job_title": answer_owner_data.get("jobTitle"),
+                        "acc_answer_user_tenure": answer_owner_data.get("tenure")
+                    })
+                # Without an accepted answer the acc_answer_* columns are left empty
                 
-                writer.writerow(row)
+                batch.append(row)
+                if len(batch) >= CSV_BATCH_SIZE:
+                    writer.writerows(batch)
+                    batch.clear()
+            
+            writer.writerows(batch)
     finally:
         stop_event.set()
-        if not VERBOSE:
+        if SHOW_PROGRESS:
             loading_thread.join()
+        if not VERBOSE:
             print("\rData export to CSV complete!        ")
         
     end_time = datetime.now()
@@ -682,6 +857,10 @@ def export_to_csv():
     print(f"   Total user data API calls: {len(USER_DATA_CACHE)}")
     print(f"   Total cached answers: {len(ANSWER_CACHE)}")
     print(f"   Additional API v2.3 calls: {API_V2_CALLS}")
+    print(f"   API v2.3 answer batch calls: {API_V2_ANSWER_CALLS}")
         
 if __name__ == "__main__":
-    export_to_csv()
\ No newline at end of file
+    try:
+        export_to_csv()
+    finally:
+        SESSION.close()
\ No newline at end of file
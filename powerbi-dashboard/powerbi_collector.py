@@ -1,37 +1,112 @@
 import argparse
+import atexit
+import contextlib
+import copy
 import aiohttp
 import asyncio
+import functools
 import json
+import os
+import queue
 import time
 import itertools
-import threading
-import schedule
 import signal
 import sys
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timedelta
 from urllib.parse import urlparse
 import logging
-from typing import Dict, List, Optional, Set
-from collections import defaultdict
+import logging.handlers
+from typing import Dict, List, Optional, Set, Tuple
+from collections import OrderedDict, defaultdict, deque
 
-# Global counters and caches
+# orjson parses API responses and writes the export considerably faster; fall back to the standard library if it's not installed
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    json_loads = json.loads
+
+# uvloop is a faster drop-in event loop; it's optional and not available on Windows
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+class LRUCache(OrderedDict):
+    """Dict that evicts its least recently used entry past maxsize and, if ttl is set, entries older than ttl seconds"""
+    def __init__(self, maxsize: int, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.set_times = {}
+        super().__init__()
+    
+    def _expired(self, key) -> bool:
+        return self.ttl is not None and time.time() - self.set_times.get(key, 0) > self.ttl
+    
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if self._expired(key):
+            del self[key]
+            raise KeyError(key)
+        self.move_to_end(key)
+        return value
+    
+    def __contains__(self, key) -> bool:
+        return super().__contains__(key) and not self._expired(key)
+    
+    def __setitem__(self, key, value):
+        if super().__contains__(key):
+            self.move_to_end(key)
+        super().__setitem__(key, value)
+        self.set_times[key] = time.time()
+        if len(self) > self.maxsize:
+            del self[next(iter(self))]
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.set_times.pop(key, None)
+    
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+class RateLimiter:
+    """
+    Allows at most `rate` requests to start in any `period` seconds, matching how the API's burst throttle counts.
+    acquire() claims its start time before it awaits anything, so concurrent callers need no lock
+    """
+    def __init__(self, rate: int, period: float):
+        self.period = period
+        self.starts = deque(maxlen=rate)  # Start times of the last `rate` requests, oldest first
+    
+    async def acquire(self):
+        now = time.monotonic()
+        start = now
+        if len(self.starts) == self.starts.maxlen:
+            # The request `rate` places back must have left the window before this one can start
+            start = max(now, self.starts[0] + self.period)
+        self.starts.append(start)
+        if start > now:
+            await asyncio.sleep(start - now)
+
+# Global counters and caches. These live for the whole process, across scheduled runs, so they are bounded
+CACHE_MAX_SIZE = 50000
+INFLIGHT_REQUESTS = {}  # (url, frozenset(params)) -> [Future shared by concurrent identical requests, waiter count]
 API_V2_CALLS = 0
 API_V3_CALLS = 0
-USER_CACHE = {}
-USER_DETAILS_CACHE = {}
-SME_CACHE = {}
-ACCEPTED_ANSWERS_CACHE = {}
+USER_DETAILS_CACHE = LRUCache(CACHE_MAX_SIZE, ttl=3600)  # User details go stale between runs
+# Tag SMEs rarely change, so they are kept a little over a day for the next daily scheduled run to reuse
+SME_DATA_CACHE = LRUCache(CACHE_MAX_SIZE, ttl=26 * 3600)
+USER_REFERENCE_CACHE = {}  # user id -> owner/editor record shared by the export's records; cleared every run
 
 # Rate limiting configuration according to Teams API v3 Docs.
 # Burst throttle: 50 requests in 2 seconds - we stay conservative
 BURST_LIMIT_REQUESTS = 45  # Stay under 50 to be safe
 BURST_LIMIT_WINDOW = 2.0   # 2 seconds
 
-# Token bucket: 5000 max tokens, 100 tokens per 60 seconds refill
-TOKEN_BUCKET_MAX = 5000
-TOKEN_BUCKET_REFILL_RATE = 100  # tokens per 60 seconds
-TOKEN_BUCKET_REFILL_INTERVAL = 60  # seconds
-
 # Conservative retry delays - we NEVER give up on 429s
 MIN_RETRY_DELAY = 5.0    # Minimum wait time on 429
 MAX_RETRY_DELAY = 300.0  # Maximum wait time (5 minutes)
@@ -40,72 +115,40 @@ BACKOFF_MULTIPLIER = 1.5 # Exponential backoff multiplier
 # Rate limiting retry delay
 RATE_LIMIT_RETRY_DELAY = 5.0  # Default retry delay for rate limiting
 
-# Async semaphore for rate limiting (burst throttle)
-BURST_LIMITER = None
-
-# Token bucket tracking
-class TokenBucket:
-    def __init__(self):
-        self.tokens = TOKEN_BUCKET_MAX
-        self.max_tokens = TOKEN_BUCKET_MAX
-        self.refill_rate = TOKEN_BUCKET_REFILL_RATE
-        self.refill_interval = TOKEN_BUCKET_REFILL_INTERVAL
-        self.last_refill = time.time()
-        self.lock = asyncio.Lock()
-    
-    async def wait_for_token(self):
-        """Wait until a token is available, with token bucket refill logic"""
-        async with self.lock:
-            now = time.time()
-            # Calculate how many refill cycles have passed
-            time_passed = now - self.last_refill
-            refill_cycles = time_passed / self.refill_interval
-            
-            if refill_cycles >= 1:
-                # Add tokens based on refill cycles
-                tokens_to_add = int(refill_cycles) * self.refill_rate
-                self.tokens = min(self.max_tokens, self.tokens + tokens_to_add)
-                self.last_refill = now
-                log(f"Token bucket refilled: {self.tokens}/{self.max_tokens} tokens available")
-            
-            # If no tokens available, wait for next refill
-            while self.tokens <= 0:
-                wait_time = self.refill_interval - (time.time() - self.last_refill)
-                if wait_time > 0:
-                    log(f"Token bucket empty, waiting {wait_time:.1f} seconds for refill...")
-                    await asyncio.sleep(wait_time)
-                
-                # Refill tokens
-                now = time.time()
-                time_passed = now - self.last_refill
-                if time_passed >= self.refill_interval:
-                    self.tokens = min(self.max_tokens, self.tokens + self.refill_rate)
-                    self.last_refill = now
-                    log(f"Token bucket refilled: {self.tokens}/{self.max_tokens} tokens available")
-            
-            # Consume a token
-            self.tokens -= 1
-            return True
+# Caps how many requests are in flight at once. Created per run in collect_powerbi_data
+CONCURRENCY_LIMITER = None
+
+# Keeps request starts under the burst throttle, so fast responses can't push the request rate into 429s.
+# Any 429s that still happen are handled by with_rate_limit_retry's backoff. Created per run in collect_powerbi_data
+RATE_LIMITER = None
 
-# Global token bucket instance
-TOKEN_BUCKET = TokenBucket()
+# Below this many users the per-user transform runs inline; process start-up and pickling would cost more than it saves
+PROCESS_POOL_MIN_USERS = 1000
 
 # Global configuration
 CONFIG = {}
 VERBOSE = False
 RUNNING = True
+logger = logging.getLogger(__name__)  # Replaced by setup_logging in main(); worker processes use this one
 
 def setup_logging(verbose: bool = False):
-    """Setup logging configuration"""
+    """Setup logging configuration. Records are written by a listener thread so logging never blocks the event loop"""
     level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(
-        level=level,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('powerbi_collector.log'),
-            logging.StreamHandler()
-        ]
-    )
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    handlers = [
+        logging.FileHandler('powerbi_collector.log'),
+        logging.StreamHandler()
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    listener.start()
+    atexit.register(listener.stop)  # Flush queued records on exit
+    
+    # The listener's handlers do the formatting, so the queue handler passes the bare message through
+    logging.basicConfig(level=level, format='%(message)s', handlers=[logging.handlers.QueueHandler(log_queue)])
     return logging.getLogger(__name__)
 
 def signal_handler(signum, frame):
@@ -115,12 +158,56 @@ def signal_handler(signum, frame):
     RUNNING = False
     sys.exit(0)
 
-def loading_animation(stop_event, message):
-    """Show loading animation with spinner"""
+def request_shutdown(task: asyncio.Task):
+    """Handle graceful shutdown from inside the event loop by cancelling the running export"""
+    global RUNNING
+    logger.info("Received interrupt signal, shutting down gracefully...")
+    RUNNING = False
+    task.cancel()
+
+async def run_until_shutdown(coro):
+    """Run coro until it finishes or SIGINT/SIGTERM cancels it, letting sessions and spinners unwind cleanly"""
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, request_shutdown, asyncio.current_task())
+        except NotImplementedError:
+            signal.signal(signum, signal_handler)  # Windows has no loop signal handlers
+    
+    try:
+        await coro
+    except asyncio.CancelledError:
+        if RUNNING:
+            raise
+
+async def loading_animation(message: str):
+    """Show loading animation with spinner until cancelled"""
     spinner = itertools.cycle(['|', '/', '-', '\\'])
-    while not stop_event.is_set():
+    while True:
         print(f"\r{message} {next(spinner)}", end='', flush=True)
-        time.sleep(0.2)
+        await asyncio.sleep(0.2)
+
+@contextlib.asynccontextmanager
+async def loading_spinner(message: str, done_message: str):
+    """
+    Spin loading_animation on the event loop while the block runs, unless verbose logging is on.
+    The spinner only runs on a terminal - scheduled runs usually redirect stdout to a file it would just flood
+    """
+    if VERBOSE:
+        yield
+        return
+    
+    spinner_task = asyncio.create_task(loading_animation(message)) if sys.stdout.isatty() else None
+    try:
+        yield
+    finally:
+        if spinner_task is not None:
+            spinner_task.cancel()
+            try:
+                await spinner_task
+            except asyncio.CancelledError:
+                pass
+        print(f"\r{done_message}        ")
 
 def detect_instance_type(base_url: str) -> tuple:
     """
@@ -191,18 +278,14 @@ def get_date_range(time_filter):
     return from_date, to_date
 
 def convert_date_to_epoch(date_string: str) -> int:
-    """Convert YYYY-MM-DD date string to epoch timestamp"""
+    """Convert YYYY-MM-DD date string to epoch timestamp, raising ValueError if it's malformed"""
     if not date_string:
         return None
     
-    try:
-        dt = datetime.strptime(date_string, '%Y-%m-%d')
-        # Set to start of day (00:00:00)
-        dt = dt.replace(hour=0, minute=0, second=0, microsecond=0)
-        return int(dt.timestamp())
-    except ValueError as e:
-        log(f"Error converting date {date_string} to epoch: {str(e)}")
-        return None
+    dt = datetime.strptime(date_string, '%Y-%m-%d')
+    # Set to start of day (00:00:00)
+    dt = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    return int(dt.timestamp())
 
 def convert_epoch_to_utc_timestamp(epoch_timestamp):
     """Convert epoch timestamp to UTC timestamp format like 2024-01-03T17:21:01.323"""
@@ -210,11 +293,14 @@ def convert_epoch_to_utc_timestamp(epoch_timestamp):
         return None
     
     try:
-        # Convert epoch to datetime in UTC
-        dt = datetime.fromtimestamp(epoch_timestamp, tz=timezone.utc)
-        # Format as requested: YYYY-MM-DDTHH:MM:SS.mmm
-        return dt.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]  # Remove last 3 digits from microseconds to get milliseconds
-    except (ValueError, TypeError, OSError) as e:
+        # Format as requested: YYYY-MM-DDTHH:MM:SS.mmm, via time.gmtime so no datetime object is built
+        # Rounded to whole microseconds first, as datetime does, so 1704302461.323 keeps its .323
+        whole_seconds = int(epoch_timestamp // 1)
+        microseconds = round((epoch_timestamp - whole_seconds) * 1000000)
+        if microseconds == 1000000:
+            whole_seconds, microseconds = whole_seconds + 1, 0
+        return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(whole_seconds))}.{microseconds // 1000:03d}"
+    except (ValueError, TypeError, OSError, OverflowError) as e:
         log(f"Error converting epoch timestamp {epoch_timestamp}: {str(e)}")
         return None
 
@@ -225,166 +311,177 @@ def log(message: str):
     else:
         logger.info(message)
 
-async def make_api_request(session: aiohttp.ClientSession, url: str, params: Dict = None) -> Optional[Dict]:
-    """Make async API request with persistent retry logic - never give up on 429s"""
-    global API_V3_CALLS, RATE_LIMITER
-    
-    # Different retry limits for different error types
-    max_non_rate_limit_retries = 3  # For timeouts, server errors, etc.
-    non_rate_limit_retry_count = 0
-    
-    # For rate limits (429), we never give up but use exponential backoff
-    rate_limit_retry_count = 0
-    current_retry_delay = MIN_RETRY_DELAY
-    
-    while True:
-        try:
-            # Use semaphore for rate limiting
-            async with RATE_LIMITER:
-                API_V3_CALLS += 1
-                
-                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 429:
+def with_rate_limit_retry(api_name: str):
+    """Retry a single-attempt API coroutine - never give up on 429s, give up on other errors after 3 retries"""
+    def decorator(attempt):
+        @functools.wraps(attempt)
+        async def wrapper(session: aiohttp.ClientSession, url: str, params: Dict = None) -> Optional[Dict]:
+            # Different retry limits for different error types
+            max_non_rate_limit_retries = 3  # For timeouts, server errors, etc.
+            non_rate_limit_retry_count = 0
+            
+            # For rate limits (429), we never give up but use exponential backoff
+            rate_limit_retry_count = 0
+            current_retry_delay = MIN_RETRY_DELAY
+            
+            while True:
+                try:
+                    return await attempt(session, url, params)
+                except aiohttp.ClientResponseError as e:
+                    if e.status == 429:
                         # Rate limited - wait and retry with exponential backoff
-                        retry_after = response.headers.get('Retry-After')
-                        if retry_after:
-                            wait_time = float(retry_after)
-                        else:
+                        try:
+                            wait_time = float(e.headers['Retry-After'])
+                        except (TypeError, KeyError, ValueError):
                             wait_time = min(current_retry_delay, MAX_RETRY_DELAY)
                             current_retry_delay = min(current_retry_delay * BACKOFF_MULTIPLIER, MAX_RETRY_DELAY)
                         
                         rate_limit_retry_count += 1
-                        log(f"Rate limited (429), waiting {wait_time:.1f} seconds before retry #{rate_limit_retry_count}")
+                        log(f"Rate limited (429) on {api_name}, waiting {wait_time:.1f} seconds before retry #{rate_limit_retry_count}")
                         await asyncio.sleep(wait_time)
                         continue  # Never give up on rate limits
-                    
-                    if response.status == 200:
-                        return await response.json()
-                    
-                    # Other HTTP errors - retry with limit
-                    non_rate_limit_retry_count += 1
-                    if non_rate_limit_retry_count >= max_non_rate_limit_retries:
-                        log(f"API request failed with status {response.status} for {url} after {max_non_rate_limit_retries} retries")
-                        return None
-                    
-                    log(f"API request failed with status {response.status} for {url}, retry {non_rate_limit_retry_count}/{max_non_rate_limit_retries}")
-                    await asyncio.sleep(1)
-                    continue
-                    
-        except asyncio.TimeoutError:
-            non_rate_limit_retry_count += 1
-            if non_rate_limit_retry_count >= max_non_rate_limit_retries:
-                log(f"Request timeout for {url} after {max_non_rate_limit_retries} retries")
-                return None
-            log(f"Request timeout for {url}, retry {non_rate_limit_retry_count}/{max_non_rate_limit_retries}")
-            await asyncio.sleep(1)
-            continue
-            
-        except Exception as e:
-            if "429" in str(e) or "rate limit" in str(e).lower():
-                # Treat as rate limit - never give up
-                wait_time = min(current_retry_delay, MAX_RETRY_DELAY)
-                current_retry_delay = min(current_retry_delay * BACKOFF_MULTIPLIER, MAX_RETRY_DELAY)
-                rate_limit_retry_count += 1
-                log(f"Rate limit error: {str(e)}, waiting {wait_time:.1f} seconds before retry #{rate_limit_retry_count}")
-                await asyncio.sleep(wait_time)
-                continue
-            else:
-                # Other errors - retry with limit
+                    failure = f"status {e.status}"
+                except asyncio.TimeoutError:
+                    failure = "timeout"
+                except aiohttp.ClientConnectionError as e:
+                    failure = f"connection error: {e}"
+                except Exception as e:
+                    failure = f"error: {e}"
+                
+                # Everything other than a 429 - retry with limit
                 non_rate_limit_retry_count += 1
                 if non_rate_limit_retry_count >= max_non_rate_limit_retries:
-                    log(f"API request failed for {url} after {max_non_rate_limit_retries} retries: {str(e)}")
+                    log(f"{api_name} request failed for {url} after {max_non_rate_limit_retries} retries ({failure})")
                     return None
-                log(f"API request failed for {url}: {str(e)}, retry {non_rate_limit_retry_count}/{max_non_rate_limit_retries}")
+                log(f"{api_name} request failed for {url} ({failure}), retry {non_rate_limit_retry_count}/{max_non_rate_limit_retries}")
                 await asyncio.sleep(1)
+        return wrapper
+    return decorator
+
+def single_flight(request):
+    """Share one in-flight request between concurrent callers asking for the same URL and params (GETs only)"""
+    @functools.wraps(request)
+    async def wrapper(session: aiohttp.ClientSession, url: str, params: Dict = None) -> Optional[Dict]:
+        key = (url, frozenset((params or {}).items()))
+        while key in INFLIGHT_REQUESTS:
+            in_flight = INFLIGHT_REQUESTS[key]
+            in_flight[1] += 1
+            try:
+                # Shielded so one waiter being cancelled doesn't cancel the request for everyone else
+                result = await asyncio.shield(in_flight[0])
+            except asyncio.CancelledError:
+                if not in_flight[0].cancelled():
+                    raise
+                # The caller that made the request was cancelled, not us, so make it again
                 continue
+            # Every caller gets its own copy, since callers are free to modify what they get back
+            return copy.deepcopy(result)
+        
+        future = asyncio.get_running_loop().create_future()
+        in_flight = INFLIGHT_REQUESTS[key] = [future, 0]
+        try:
+            result = await request(session, url, params)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Marks it retrieved so nothing is logged when no one was waiting
+            raise
+        finally:
+            INFLIGHT_REQUESTS.pop(key, None)
+        future.set_result(result)
+        return copy.deepcopy(result) if in_flight[1] else result
+    return wrapper
 
+async def fetch_json(session: aiohttp.ClientSession, url: str, params: Dict = None) -> Dict:
+    """Make a single GET request, raising ClientResponseError for anything other than a 200"""
+    async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
+        if response.status != 200:
+            raise aiohttp.ClientResponseError(
+                response.request_info,
+                response.history,
+                status=response.status,
+                message=response.reason,
+                headers=response.headers
+            )
+        # Both orjson and json accept the raw body, which skips aiohttp's bytes-to-str decode
+        return json_loads(await response.read())
+
+@single_flight
+@with_rate_limit_retry("API v3")
+async def make_api_request(session: aiohttp.ClientSession, url: str, params: Dict = None) -> Optional[Dict]:
+    """Make async API request with persistent retry logic - never give up on 429s"""
+    global API_V3_CALLS
+    async with CONCURRENCY_LIMITER:
+        await RATE_LIMITER.acquire()
+        API_V3_CALLS += 1
+        return await fetch_json(session, url, params)
+
+@single_flight
+@with_rate_limit_retry("API v2")
 async def make_api_v2_request(session: aiohttp.ClientSession, url: str, params: Dict = None) -> Optional[Dict]:
     """Make async API v2.3 request with persistent retry logic - never give up on 429s"""
-    global API_V2_CALLS, RATE_LIMITER
+    global API_V2_CALLS
+    async with CONCURRENCY_LIMITER:
+        await RATE_LIMITER.acquire()
+        API_V2_CALLS += 1
+        return await fetch_json(session, url, params)
+
+def create_session() -> aiohttp.ClientSession:
+    """Create the ClientSession shared by every collector, with a pooled keep-alive connector"""
+    max_concurrency = CONFIG.get('max_concurrency', BURST_LIMIT_REQUESTS)
+    connector = aiohttp.TCPConnector(
+        limit=max_concurrency * 2,
+        limit_per_host=max_concurrency,
+        ttl_dns_cache=300,
+        keepalive_timeout=75
+    )
+    timeout = aiohttp.ClientTimeout(total=300)  # 5 minute timeout
+    return aiohttp.ClientSession(connector=connector, headers=CONFIG['headers'], timeout=timeout)
+
+async def iter_all_pages(session: aiohttp.ClientSession, url: str, base_params: Dict = None):
+    """
+    Yield every item of a paginated v3 endpoint. Page 1 gives totalPages, the rest are fetched concurrently
+    and yielded in page order as soon as each is ready, so callers can work on early pages while later ones load
+    """
+    # The parameters every page shares are merged once; each page then only adds its number
+    page_params = {**(base_params or {}), 'pageSize': 100}
     
-    # Different retry limits for different error types
-    max_non_rate_limit_retries = 3  # For timeouts, server errors, etc.
-    non_rate_limit_retry_count = 0
+    data = await make_api_request(session, url, {**page_params, 'page': 1})
+    if not data:
+        return
     
-    # For rate limits (429), we never give up but use exponential backoff
-    rate_limit_retry_count = 0
-    current_retry_delay = MIN_RETRY_DELAY
+    for item in data.get("items", []):
+        yield item
     
-    while True:
-        try:
-            async with RATE_LIMITER:
-                API_V2_CALLS += 1
-                
-                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 429:
-                        # Rate limited - wait and retry with exponential backoff
-                        retry_after = response.headers.get('Retry-After')
-                        if retry_after:
-                            wait_time = float(retry_after)
-                        else:
-                            wait_time = min(current_retry_delay, MAX_RETRY_DELAY)
-                            current_retry_delay = min(current_retry_delay * BACKOFF_MULTIPLIER, MAX_RETRY_DELAY)
-                        
-                        rate_limit_retry_count += 1
-                        log(f"Rate limited (429) on v2 API, waiting {wait_time:.1f} seconds before retry #{rate_limit_retry_count}")
-                        await asyncio.sleep(wait_time)
-                        continue  # Never give up on rate limits
-                    
-                    if response.status == 200:
-                        return await response.json()
-                    
-                    # Other HTTP errors - retry with limit
-                    non_rate_limit_retry_count += 1
-                    if non_rate_limit_retry_count >= max_non_rate_limit_retries:
-                        log(f"API v2 request failed with status {response.status} for {url} after {max_non_rate_limit_retries} retries")
-                        return None
-                    
-                    log(f"API v2 request failed with status {response.status} for {url}, retry {non_rate_limit_retry_count}/{max_non_rate_limit_retries}")
-                    await asyncio.sleep(1)
-                    continue
-                    
-        except asyncio.TimeoutError:
-            non_rate_limit_retry_count += 1
-            if non_rate_limit_retry_count >= max_non_rate_limit_retries:
-                log(f"Request timeout for {url} after {max_non_rate_limit_retries} retries")
-                return None
-            log(f"Request timeout for {url}, retry {non_rate_limit_retry_count}/{max_non_rate_limit_retries}")
-            await asyncio.sleep(1)
-            continue
-            
-        except Exception as e:
-            if "429" in str(e) or "rate limit" in str(e).lower():
-                # Treat as rate limit - never give up
-                wait_time = min(current_retry_delay, MAX_RETRY_DELAY)
-                current_retry_delay = min(current_retry_delay * BACKOFF_MULTIPLIER, MAX_RETRY_DELAY)
-                rate_limit_retry_count += 1
-                log(f"Rate limit error on v2 API: {str(e)}, waiting {wait_time:.1f} seconds before retry #{rate_limit_retry_count}")
-                await asyncio.sleep(wait_time)
-                continue
-            else:
-                # Other errors - retry with limit
-                non_rate_limit_retry_count += 1
-                if non_rate_limit_retry_count >= max_non_rate_limit_retries:
-                    log(f"API v2 request failed for {url} after {max_non_rate_limit_retries} retries: {str(e)}")
-                    return None
-                log(f"API v2 request failed for {url}: {str(e)}, retry {non_rate_limit_retry_count}/{max_non_rate_limit_retries}")
-                await asyncio.sleep(1)
-                continue
+    # make_api_request's concurrency limiter caps how many of these are in flight
+    page_tasks = [
+        asyncio.create_task(make_api_request(session, url, {**page_params, 'page': page}))
+        for page in range(2, data.get("totalPages", 1) + 1)
+    ]
+    try:
+        for page_task in page_tasks:
+            page_data = await page_task
+            if page_data:
+                for item in page_data.get("items", []):
+                    yield item
+    finally:
+        # Don't leave pages loading if the caller stops iterating early
+        for page_task in page_tasks:
+            page_task.cancel()
+
+async def fetch_all_pages(session: aiohttp.ClientSession, url: str, base_params: Dict = None) -> List[Dict]:
+    """Fetch every page of a paginated v3 endpoint into a single list"""
+    return [item async for item in iter_all_pages(session, url, base_params)]
 
 async def get_users_created_in_timeframe(session: aiohttp.ClientSession) -> List[Dict]:
     """Get users created within the specified timeframe"""
-    all_users = []
-    page = 1
-    total_pages = None
+    # Epoch bounds for filtering, converted from the date strings once in main()
+    from_epoch = CONFIG.get('from_epoch')
+    to_epoch = CONFIG.get('to_epoch')
     
-    # Convert date strings to epoch timestamps for filtering
-    from_epoch = None
-    to_epoch = None
-    
-    if CONFIG.get('from_date') and CONFIG.get('to_date'):
-        from_epoch = convert_date_to_epoch(CONFIG['from_date'])
-        to_epoch = convert_date_to_epoch(CONFIG['to_date']) + 86400  # Add 24 hours to include end date
+    if from_epoch and to_epoch:
         log(f"Filtering users created between {CONFIG['from_date']} and {CONFIG['to_date']}")
         log(f"Epoch range: {from_epoch} to {to_epoch}")
     
@@ -393,238 +490,108 @@ async def get_users_created_in_timeframe(session: aiohttp.ClientSession) -> List
     # If no date filter is specified, use the original logic
     if not from_epoch or not to_epoch:
         log("No date filter specified, fetching all users from API v3")
-        while True:
-            params = {'page': page, 'pageSize': 100}
-            
-            url = f"{CONFIG['api_v3_base']}/users"
-            log(f"Fetching page {page}/{total_pages or '?'} from users endpoint")
-            
-            data = await make_api_request(session, url, params)
-            if not data:
-                break
-                
-            users = data.get("items", [])
-            all_users.extend(users)
-            
-            if total_pages is None:
-                total_pages = data.get("totalPages", 1)
-                log(f"Total pages to fetch: {total_pages}")
-            
-            log(f"Retrieved {len(users)} users from page {page}/{total_pages} (total collected: {len(all_users)})")
-            
-            if page >= total_pages:
-                log(f"All pages fetched. Total users: {len(all_users)}")
-                break
-            
-            page += 1
-        
+        all_users = await fetch_all_pages(session, f"{CONFIG['api_v3_base']}/users")
+        log(f"All pages fetched. Total users: {len(all_users)}")
         return all_users
     
     # When date filtering is needed, we need to get users from API v2.3 which has creation_date
     log("Date filter specified, fetching users from API v2.3 with creation_date")
     
-    # First, get all user IDs from API v3
-    log("Step 1: Getting all user IDs from API v3")
-    all_user_ids = []
-    v3_page = 1
-    v3_total_pages = None
-    
-    while True:
-        params = {'page': v3_page, 'pageSize': 100}
-        url = f"{CONFIG['api_v3_base']}/users"
-        
-        data = await make_api_request(session, url, params)
-        if not data:
-            break
-            
-        users = data.get("items", [])
-        user_ids = [user.get('id') for user in users if user.get('id')]
-        all_user_ids.extend(user_ids)
-        
-        if v3_total_pages is None:
-            v3_total_pages = data.get("totalPages", 1)
-        
-        log(f"Retrieved {len(user_ids)} user IDs from v3 page {v3_page}/{v3_total_pages}")
-        
-        if v3_page >= v3_total_pages:
-            break
-            
-        v3_page += 1
-    
-    log(f"Total user IDs collected from API v3: {len(all_user_ids)}")
-    
-    # Step 2: Get detailed user info from API v2.3 in batches and filter by creation_date
+    # Steps 1 and 2 run as a pipeline: every 20 users streamed from API v3 start a v2.3 creation_date lookup
+    # straight away, so the v2.3 requests overlap the remaining v3 pages instead of waiting for all of them
+    log("Step 1: Getting all users from API v3")
     log("Step 2: Getting detailed user info from API v2.3 and applying date filter")
     
-    filtered_users = []
+    # Keep the v3 users so the ones we keep need no further v3 lookup
+    v3_users_by_id = {}
+    
+    def to_v3_user(user_item: Dict) -> Dict:
+        creation_date = user_item['creation_date']
+        v3_user = v3_users_by_id.get(user_item.get('user_id'))
+        if v3_user:
+            # Reuse the v3 user from step 1, adding the creation date from our v2.3 data
+            v3_user['creationDate'] = creation_date
+            return v3_user
+        
+        # Convert v2.3 user format back to v3-like format for consistency
+        return {
+            'id': user_item.get('user_id'),
+            'name': user_item.get('display_name'),
+            'accountId': user_item.get('account_id'),
+            'reputation': user_item.get('reputation'),
+            'creationDate': creation_date,  # Add this for consistency
+            'role': user_item.get('user_type'),
+            # Add other fields as needed
+            'location': user_item.get('location'),
+            'jobTitle': None,  # v2.3 doesn't have job title
+            'department': None  # v2.3 doesn't have department
+        }
+    
     batch_size = 20  # API v2.3 batch size limit
+    params = {"order": "desc", "sort": "creation", **CONFIG['v2_base_params']}
     
-    for i in range(0, len(all_user_ids), batch_size):
-        batch_ids = all_user_ids[i:i + batch_size]
-        ids_string = ";".join(map(str, batch_ids))
-        
+    async def filter_batch(batch_number: int, batch_ids: List[int]) -> List[Dict]:
         # Build API v2.3 URL
-        v2_url = f"{CONFIG['api_v2_base']}/users/{ids_string}"
-        
-        # Build params dict and exclude None values
-        params = {
-            "order": "desc",
-            "sort": "creation",
-            "key": CONFIG.get("api_key"),
-            "access_token": CONFIG.get("token")
-        }
-        
-        if CONFIG["instance_type"] == "teams" and CONFIG.get("team_slug"):
-            params["team"] = CONFIG["team_slug"]
-        
-        # Remove any None values from params
-        params = {k: v for k, v in params.items() if v is not None}
-        
-        log(f"Fetching batch {i//batch_size + 1}/{(len(all_user_ids) + batch_size - 1)//batch_size} from API v2.3")
+        v2_url = CONFIG['v2_users_url_prefix'] + ";".join(map(str, batch_ids))
         
+        log(f"Fetching batch {batch_number} from API v2.3")
         user_data = await make_api_v2_request(session, v2_url, params)
+        if not user_data or 'items' not in user_data:
+            return []
         
-        if user_data and 'items' in user_data:
-            for user_item in user_data['items']:
-                creation_date = user_item.get('creation_date')
-                
-                # Apply date filter
-                if creation_date and from_epoch <= creation_date <= to_epoch:
-                    # Convert v2.3 user format back to v3-like format for consistency
-                    v3_formatted_user = {
-                        'id': user_item.get('user_id'),
-                        'name': user_item.get('display_name'),
-                        'accountId': user_item.get('account_id'),
-                        'reputation': user_item.get('reputation'),
-                        'creationDate': creation_date,  # Add this for consistency
-                        'role': user_item.get('user_type'),
-                        # Add other fields as needed
-                        'location': user_item.get('location'),
-                        'jobTitle': None,  # v2.3 doesn't have job title
-                        'department': None  # v2.3 doesn't have department
-                    }
-                    
-                    filtered_users.append(v3_formatted_user)
-                    log(f"User {user_item.get('user_id')} ({user_item.get('display_name')}) created in timeframe: {convert_epoch_to_utc_timestamp(creation_date)}")
-        
-        # Small delay between batches to respect rate limits
-        await asyncio.sleep(0.1)
+        # Apply date filter; a missing creation_date compares as 0, which is always before from_epoch
+        kept = [
+            user_item for user_item in user_data['items']
+            if from_epoch <= (user_item.get('creation_date') or 0) <= to_epoch
+        ]
+        log(f"Kept {len(kept)} users created in timeframe from batch {batch_number}")
+        # These are the same v2.3 records Step 6 asks for, so cache them to save it a second round of requests
+        for user_item in kept:
+            if user_item.get('user_id'):
+                USER_DETAILS_CACHE[user_item['user_id']] = user_item
+        return [to_v3_user(user_item) for user_item in kept]
+    
+    batch_tasks = []
+    batch_ids = []
+    async for user in iter_all_pages(session, f"{CONFIG['api_v3_base']}/users"):
+        if not user.get('id') or user['id'] in v3_users_by_id:
+            continue
+        v3_users_by_id[user['id']] = user
+        batch_ids.append(user['id'])
+        if len(batch_ids) == batch_size:
+            batch_tasks.append(asyncio.create_task(filter_batch(len(batch_tasks) + 1, batch_ids)))
+            batch_ids = []
+    if batch_ids:
+        batch_tasks.append(asyncio.create_task(filter_batch(len(batch_tasks) + 1, batch_ids)))
     
-    log(f"Filtered users in timeframe: {len(filtered_users)}")
+    log(f"Total user IDs collected from API v3: {len(v3_users_by_id)}")
     
-    # Step 3: For the filtered users, get their complete v3 data to maintain data structure consistency
-    if filtered_users:
-        log("Step 3: Getting complete v3 data for filtered users")
-        
-        # Get the v3 user data for consistency with the rest of the pipeline
-        complete_users = []
-        filtered_user_ids = [user['id'] for user in filtered_users]
-        
-        # Fetch complete v3 data in smaller batches
-        v3_batch_size = 10
-        for i in range(0, len(filtered_user_ids), v3_batch_size):
-            batch_ids = filtered_user_ids[i:i + v3_batch_size]
-            
-            # Create tasks to fetch individual user data from v3
-            tasks = []
-            for user_id in batch_ids:
-                url = f"{CONFIG['api_v3_base']}/users/{user_id}"
-                tasks.append(make_api_request(session, url))
-            
-            # Execute batch requests
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for user_id, result in zip(batch_ids, results):
-                if isinstance(result, dict) and 'id' in result:
-                    # Add the creation date from our v2.3 data
-                    filtered_user = next((u for u in filtered_users if u['id'] == user_id), None)
-                    if filtered_user:
-                        result['creationDate'] = filtered_user['creationDate']
-                    complete_users.append(result)
-                else:
-                    # Fall back to the v2.3 formatted data if v3 fetch fails
-                    filtered_user = next((u for u in filtered_users if u['id'] == user_id), None)
-                    if filtered_user:
-                        complete_users.append(filtered_user)
-            
-            log(f"Retrieved complete v3 data for batch {i//v3_batch_size + 1}/{(len(filtered_user_ids) + v3_batch_size - 1)//v3_batch_size}")
-            
-            # Small delay between batches
-            await asyncio.sleep(0.1)
-        
-        all_users = complete_users
-    else:
-        all_users = filtered_users
+    # Gathered in batch order, so users keep the order API v3 listed them in
+    filtered_users = list(itertools.chain.from_iterable(await asyncio.gather(*batch_tasks)))
     
-    log(f"Final user count after filtering: {len(all_users)}")
-    return all_users
+    log(f"Filtered users in timeframe: {len(filtered_users)}")
+    return filtered_users
 
 async def get_questions_for_user(session: aiohttp.ClientSession, user_id: int) -> List[Dict]:
     """Get all questions for a specific user using authorId parameter"""
-    all_questions = []
-    page = 1
-    total_pages = None
-    
     log(f"Fetching questions for user {user_id}")
     
-    while True:
-        params = {'page': page, 'pageSize': 100, 'authorId': user_id}
-        
-        url = f"{CONFIG['api_v3_base']}/questions"
-        
-        data = await make_api_request(session, url, params)
-        if not data:
-            break
-            
-        questions = data.get("items", [])
-        all_questions.extend(questions)
-        
-        if total_pages is None:
-            total_pages = data.get("totalPages", 1)
-        
-        if page >= total_pages:
-            break
-        
-        page += 1
+    all_questions = await fetch_all_pages(session, f"{CONFIG['api_v3_base']}/questions", {'authorId': user_id})
         
     log(f"Retrieved {len(all_questions)} questions for user {user_id}")
     return all_questions
 
 async def get_articles_for_user(session: aiohttp.ClientSession, user_id: int) -> List[Dict]:
     """Get all articles for a specific user using authorId parameter"""
-    all_articles = []
-    page = 1
-    total_pages = None
-    
     log(f"Fetching articles for user {user_id}")
     
-    while True:
-        params = {'page': page, 'pageSize': 100, 'authorId': user_id}
-        
-        url = f"{CONFIG['api_v3_base']}/articles"
-        
-        data = await make_api_request(session, url, params)
-        if not data:
-            break
-            
-        articles = data.get("items", [])
-        all_articles.extend(articles)
-        
-        if total_pages is None:
-            total_pages = data.get("totalPages", 1)
-        
-        if page >= total_pages:
-            break
-        
-        page += 1
+    all_articles = await fetch_all_pages(session, f"{CONFIG['api_v3_base']}/articles", {'authorId': user_id})
         
     log(f"Retrieved {len(all_articles)} articles for user {user_id}")
     return all_articles
 
 async def get_answers_for_questions(session: aiohttp.ClientSession, questions: List[Dict]) -> List[Dict]:
     """Get all answers for the given questions"""
-    all_answers = []
-    
     # Create semaphore for concurrent requests (respecting rate limits)
     concurrent_limit = min(10, BURST_LIMIT_REQUESTS // 4)  # Conservative limit
     semaphore = asyncio.Semaphore(concurrent_limit)
@@ -642,53 +609,25 @@ async def get_answers_for_questions(session: aiohttp.ClientSession, questions: L
                 log(f"Error fetching answers for question {question_id}: {str(e)}")
                 return []
     
-    # Process questions in batches to avoid overwhelming the API
-    batch_size = 50
-    for i in range(0, len(questions), batch_size):
-        batch = questions[i:i + batch_size]
-        log(f"Processing answers batch {i//batch_size + 1}/{(len(questions) + batch_size - 1)//batch_size}")
-        
-        tasks = [fetch_answers_for_question(question) for question in batch]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Flatten results and add to all_answers
-        for result in results:
-            if isinstance(result, list):
-                all_answers.extend(result)
-        
-        # Small delay between batches
-        await asyncio.sleep(0.5)
+    # Questions whose answerCount is 0 have nothing to fetch, so they cost no request. Any without a count are still asked
+    questions_with_answers = [question for question in questions if question.get('answerCount') != 0]
+    log(f"Fetching answers for {len(questions_with_answers)} of {len(questions)} questions, skipping those with no answers")
+    
+    # Start every question at once; the semaphore alone bounds how many run concurrently,
+    # so a new fetch starts as soon as any other finishes
+    tasks = [asyncio.create_task(fetch_answers_for_question(question)) for question in questions_with_answers]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    # Flatten the per-question lists in one C-level pass, skipping any that raised.
+    # Every success is a plain list, so an exact class check is enough and skips isinstance's MRO walk
+    all_answers = list(itertools.chain.from_iterable(result for result in results if result.__class__ is list))
     
     log(f"Retrieved {len(all_answers)} total answers")
     return all_answers
 
 async def get_paginated_data_for_question_answers(session: aiohttp.ClientSession, question_id: int) -> List[Dict]:
     """Get all answers for a specific question with pagination"""
-    all_answers = []
-    page = 1
-    total_pages = None
-    
-    while True:
-        params = {'page': page, 'pageSize': 100}
-        
-        url = f"{CONFIG['api_v3_base']}/questions/{question_id}/answers"
-        
-        data = await make_api_request(session, url, params)
-        if not data:
-            break
-            
-        answers = data.get("items", [])
-        all_answers.extend(answers)
-        
-        if total_pages is None:
-            total_pages = data.get("totalPages", 1)
-        
-        if page >= total_pages:
-            break
-        
-        page += 1
-        
-    return all_answers
+    return await fetch_all_pages(session, f"{CONFIG['api_v3_base']}/questions/{question_id}/answers")
 
 async def get_user_detailed_info_batch(session: aiohttp.ClientSession, user_ids: List[int], batch_size: int = 20) -> Dict[int, Dict]:
     """Get detailed user information from API v2.3 in batches"""
@@ -701,62 +640,71 @@ async def get_user_detailed_info_batch(session: aiohttp.ClientSession, user_ids:
         log("No valid user IDs to fetch detailed info for")
         return user_details
 
-    for i in range(0, len(valid_user_ids), batch_size):
-        batch = valid_user_ids[i:i + batch_size]
-        ids_string = ";".join(map(str, batch))
-
-        v2_url = f"{CONFIG['api_v2_base']}/users/{ids_string}"
-        log(f"Batch fetching detailed info for {len(batch)} users from {v2_url}")
-
-        # Build params dict and exclude None values
-        params = {
-            "order": "desc",
-            "sort": "reputation",
-            "key": CONFIG.get("api_key"),
-            "access_token": CONFIG.get("token")
-        }
+    # Users fetched within the cache's TTL - by the date filter or a recent scheduled run - need no new request
+    missing_user_ids = []
+    for uid in valid_user_ids:
+        user_item = USER_DETAILS_CACHE.get(uid)
+        if user_item is not None:
+            user_details[uid] = user_item
+        else:
+            missing_user_ids.append(uid)
+    log(f"Found {len(user_details)} of {len(valid_user_ids)} users' details in cache")
+    valid_user_ids = missing_user_ids
 
-        if CONFIG["instance_type"] == "teams" and CONFIG.get("team_slug"):
-            params["team"] = CONFIG["team_slug"]
+    params = {"order": "desc", "sort": "reputation", **CONFIG['v2_base_params']}
 
-        # Remove any None values from params
-        params = {k: v for k, v in params.items() if v is not None}
+    async def fetch_batch(batch: List[int]) -> Optional[Dict]:
+        v2_url = CONFIG['v2_users_url_prefix'] + ";".join(map(str, batch))
+        log(f"Batch fetching detailed info for {len(batch)} users from {v2_url}")
+        return await make_api_v2_request(session, v2_url, params)
 
-        user_data = await make_api_v2_request(session, v2_url, params)
+    # Every batch is requested at once; make_api_v2_request's concurrency limiter does the throttling
+    results = await asyncio.gather(*(
+        fetch_batch(valid_user_ids[i:i + batch_size])
+        for i in range(0, len(valid_user_ids), batch_size)
+    ), return_exceptions=True)
 
-        if user_data and 'items' in user_data:
+    for user_data in results:
+        if isinstance(user_data, dict) and 'items' in user_data:
             for user_item in user_data['items']:
                 user_id = user_item.get('user_id') if user_item else None
                 if user_id:
                     user_details[user_id] = user_item
+                    USER_DETAILS_CACHE[user_id] = user_item
 
     return user_details
 
 async def get_sme_data_for_tags(session: aiohttp.ClientSession, tag_ids: List[int]) -> Dict[int, List[int]]:
     """Get SME data for given tag IDs. Returns dict of tag_id -> list of user_ids"""
-    sme_data = {}
-    
-    # Process in batches to avoid overwhelming the API
-    batch_size = 10
-    for i in range(0, len(tag_ids), batch_size):
-        batch = tag_ids[i:i + batch_size]
-        tasks = []
-        
-        for tag_id in batch:
-            url = f"{CONFIG['api_v3_base']}/tags/{tag_id}/subject-matter-experts"
-            tasks.append(make_api_request(session, url))
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for tag_id, result in zip(batch, results):
-            if isinstance(result, dict) and 'users' in result:
-                user_ids = [user.get('id') for user in result['users'] if user.get('id')]
-                sme_data[tag_id] = user_ids
-            else:
-                sme_data[tag_id] = []
-        
-        log(f"Processed SME data for batch {i//batch_size + 1}/{(len(tag_ids) + batch_size - 1)//batch_size}")
+    sme_data = dict.fromkeys(tag_ids)  # Filled in tag order whether a tag comes from the cache or the API
+    api_v3_base = CONFIG['api_v3_base']
+    
+    # Tags looked up by a recent scheduled run need no new request
+    missing_tag_ids = []
+    for tag_id in tag_ids:
+        user_ids = SME_DATA_CACHE.get(tag_id)
+        if user_ids is not None:
+            sme_data[tag_id] = user_ids
+        else:
+            missing_tag_ids.append(tag_id)
+    log(f"Found SME data for {len(tag_ids) - len(missing_tag_ids)} of {len(tag_ids)} tags in cache")
+    
+    # Request every tag at once; make_api_request's concurrency limiter bounds how many are in flight
+    results = await asyncio.gather(*(
+        make_api_request(session, f"{api_v3_base}/tags/{tag_id}/subject-matter-experts")
+        for tag_id in missing_tag_ids
+    ), return_exceptions=True)
+    
+    for tag_id, result in zip(missing_tag_ids, results):
+        if isinstance(result, dict) and 'users' in result:
+            user_ids = [user.get('id') for user in result['users'] if user.get('id')]
+            sme_data[tag_id] = user_ids
+            SME_DATA_CACHE[tag_id] = user_ids
+        else:
+            # Failures aren't cached so the next run asks again
+            sme_data[tag_id] = []
     
+    log(f"Processed SME data for {len(tag_ids)} tags")
     return sme_data
 
 def calculate_account_longevity(creation_date: int) -> int:
@@ -764,21 +712,32 @@ def calculate_account_longevity(creation_date: int) -> int:
     if not creation_date:
         return 0
     
-    created = datetime.fromtimestamp(creation_date)
-    now = datetime.now()
-    return (now - created).days
+    # Whole days elapsed, as timedelta.days would give, worked out on epoch seconds without building datetimes
+    return int((time.time() - creation_date) // 86400)
+
+def collect_post_tags(posts: List[Dict], tag_names: Dict[int, str]):
+    """Record the ID and name of every tag on these questions/articles in tag_names"""
+    for post in posts:
+        for tag in post.get('tags', ()):
+            if not isinstance(tag, dict):
+                continue
+            tag_id = tag.get('id')
+            if not tag_id:
+                continue
+            # The placeholder name is only built for the rare tag that arrives without one
+            tag_names[tag_id] = tag['name'] if 'name' in tag else f"tag_{tag_id}"
 
-def get_user_sme_tags(user_id: int, all_sme_data: Dict[int, List[int]]) -> List[str]:
-    """Get list of tag names where user is an SME"""
-    sme_tag_names = []
+def build_user_sme_tags_index(all_sme_data: Dict[int, List[int]], tag_names: Dict[int, str]) -> Dict[int, List[str]]:
+    """Invert tag_id -> SME user_ids into user_id -> names of the tags they're an SME for"""
+    user_sme_tags = defaultdict(list)
     
     for tag_id, sme_user_ids in all_sme_data.items():
-        if user_id in sme_user_ids:
-            # Find the tag name from our tag cache or fetch it
-            tag_name = SME_CACHE.get(tag_id, f"tag_{tag_id}")
-            sme_tag_names.append(tag_name)
+        # Every tag looked up in Step 7 was named by collect_post_tags, so no fallback is needed
+        tag_name = tag_names[tag_id]
+        for user_id in sme_user_ids:
+            user_sme_tags[user_id].append(tag_name)
     
-    return sme_tag_names
+    return user_sme_tags
 
 def extract_accepted_answers_from_all_answers(all_answers: List[Dict]) -> Dict[int, Dict]:
     """Extract accepted answers from the complete answers collection"""
@@ -794,128 +753,130 @@ def extract_accepted_answers_from_all_answers(all_answers: List[Dict]) -> Dict[i
                     'score': answer.get('score'),
                     'owner': answer.get('owner')
                 }
-                log(f"Found accepted answer {answer.get('id')} for question {question_id}")
     
     log(f"Extracted {len(accepted_answers)} accepted answers from answers collection")
     return accepted_answers
 
-def process_answers_data(user_answers: List[Dict]) -> List[Dict]:
-    """Process answers data into a clean format"""
+def format_user_reference(user: Dict) -> Dict:
+    """
+    Project an owner/editor object from API v3 onto the snake_case fields used in the export.
+    The same few people own and edit most posts, so each projection is built once per run and shared
+    """
+    user_id = user.get('id')
+    reference = USER_REFERENCE_CACHE.get(user_id) if user_id is not None else None
+    if reference is None:
+        get = user.get
+        reference = {
+            'id': user_id,
+            'account_id': get('accountId'),
+            'name': get('name'),
+            'avatar_url': get('avatarUrl'),
+            'web_url': get('webUrl'),
+            'reputation': get('reputation'),
+            'role': get('role')
+        }
+        if user_id is not None:
+            USER_REFERENCE_CACHE[user_id] = reference
+    return reference
+
+def process_answers_data(user_answers: List[Dict]) -> Tuple[List[Dict], int, int]:
+    """Process answers data into a clean format. Returns (processed answers, total score, accepted answer count)"""
     processed_answers = []
+    total_answer_score = 0
+    accepted_answers_given = 0
     
     for answer in user_answers:
+        # Bound once per record; every field below is read through it
+        get = answer.get
+        
         # Get owner information
-        owner = answer.get('owner', {})
-        last_editor = answer.get('lastEditor', {})
-        last_activity_user = answer.get('lastActivityUser', {})
+        owner = get('owner', {})
+        last_editor = get('lastEditor', {})
+        last_activity_user = get('lastActivityUser', {})
         
         answer_data = {
-            'answer_id': answer.get('id'),
-            'question_id': answer.get('questionId'),
-            'score': answer.get('score', 0),
-            'is_accepted': answer.get('isAccepted', False),
-            'is_deleted': answer.get('isDeleted', False),
-            'is_bookmarked': answer.get('isBookmarked', False),
-            'is_followed': answer.get('isFollowed', False),
-            'creation_date': answer.get('creationDate'),
-            'locked_date': answer.get('lockedDate'),
-            'last_edit_date': answer.get('lastEditDate'),
-            'last_activity_date': answer.get('lastActivityDate'),
-            'deletion_date': answer.get('deletionDate'),
-            'comment_count': answer.get('commentCount', 0),
-            'web_url': answer.get('webUrl'),
-            'share_link': answer.get('shareLink'),
-            'user_can_follow': answer.get('userCanFollow', False),
-            'can_be_followed': answer.get('canBeFollowed', False),
-            'is_subject_matter_expert': answer.get('isSubjectMatterExpert', False),
-            'owner': {
-                'id': owner.get('id'),
-                'account_id': owner.get('accountId'),
-                'name': owner.get('name'),
-                'avatar_url': owner.get('avatarUrl'),
-                'web_url': owner.get('webUrl'),
-                'reputation': owner.get('reputation'),
-                'role': owner.get('role')
-            },
-            'last_editor': {
-                'id': last_editor.get('id'),
-                'account_id': last_editor.get('accountId'),
-                'name': last_editor.get('name'),
-                'avatar_url': last_editor.get('avatarUrl'),
-                'web_url': last_editor.get('webUrl'),
-                'reputation': last_editor.get('reputation'),
-                'role': last_editor.get('role')
-            } if last_editor else None,
-            'last_activity_user': {
-                'id': last_activity_user.get('id'),
-                'account_id': last_activity_user.get('accountId'),
-                'name': last_activity_user.get('name'),
-                'avatar_url': last_activity_user.get('avatarUrl'),
-                'web_url': last_activity_user.get('webUrl'),
-                'reputation': last_activity_user.get('reputation'),
-                'role': last_activity_user.get('role')
-            } if last_activity_user else None
+            'answer_id': get('id'),
+            'question_id': get('questionId'),
+            'score': get('score', 0),
+            'is_accepted': get('isAccepted', False),
+            'is_deleted': get('isDeleted', False),
+            'is_bookmarked': get('isBookmarked', False),
+            'is_followed': get('isFollowed', False),
+            'creation_date': get('creationDate'),
+            'locked_date': get('lockedDate'),
+            'last_edit_date': get('lastEditDate'),
+            'last_activity_date': get('lastActivityDate'),
+            'deletion_date': get('deletionDate'),
+            'comment_count': get('commentCount', 0),
+            'web_url': get('webUrl'),
+            'share_link': get('shareLink'),
+            'user_can_follow': get('userCanFollow', False),
+            'can_be_followed': get('canBeFollowed', False),
+            'is_subject_matter_expert': get('isSubjectMatterExpert', False),
+            'owner': format_user_reference(owner),
+            'last_editor': format_user_reference(last_editor) if last_editor else None,
+            'last_activity_user': format_user_reference(last_activity_user) if last_activity_user else None
         }
         processed_answers.append(answer_data)
+        
+        # Accumulate the answer metrics while the record is at hand
+        total_answer_score += answer_data['score']
+        if answer_data['is_accepted']:
+            accepted_answers_given += 1
     
-    return processed_answers
-def process_articles_data(user_articles: List[Dict]) -> List[Dict]:
-    """Process articles data into a clean format"""
+    return processed_answers, total_answer_score, accepted_answers_given
+
+def process_articles_data(user_articles: List[Dict]) -> Tuple[List[Dict], int, int]:
+    """Process articles data into a clean format. Returns (processed articles, total views, total score)"""
     processed_articles = []
+    total_article_views = 0
+    total_article_score = 0
     
     for article in user_articles:
+        # Bound once per record; every field below is read through it
+        get = article.get
+        
         # Get article tags
         article_tags = []
-        for tag in article.get('tags', []):
+        for tag in get('tags', []):
             if isinstance(tag, dict):
                 article_tags.append(tag.get('name', ''))
             else:
                 article_tags.append(str(tag))
         
         # Get owner information
-        owner = article.get('owner', {})
-        last_editor = article.get('lastEditor', {})
+        owner = get('owner', {})
+        last_editor = get('lastEditor', {})
         
         article_data = {
-            'article_id': article.get('id'),
-            'type': article.get('type'),
-            'title': article.get('title'),
+            'article_id': get('id'),
+            'type': get('type'),
+            'title': get('title'),
             'tags': article_tags,
-            'creation_date': article.get('creationDate'),
-            'last_activity_date': article.get('lastActivityDate'),
-            'score': article.get('score', 0),
-            'view_count': article.get('viewCount', 0),
-            'web_url': article.get('webUrl'),
-            'share_url': article.get('shareUrl'),
-            'is_deleted': article.get('isDeleted', False),
-            'is_obsolete': article.get('isObsolete', False),
-            'is_closed': article.get('isClosed', False),
-            'owner': {
-                'id': owner.get('id'),
-                'account_id': owner.get('accountId'),
-                'name': owner.get('name'),
-                'avatar_url': owner.get('avatarUrl'),
-                'web_url': owner.get('webUrl'),
-                'reputation': owner.get('reputation'),
-                'role': owner.get('role')
-            },
-            'last_editor': {
-                'id': last_editor.get('id'),
-                'account_id': last_editor.get('accountId'),
-                'name': last_editor.get('name'),
-                'avatar_url': last_editor.get('avatarUrl'),
-                'web_url': last_editor.get('webUrl'),
-                'reputation': last_editor.get('reputation'),
-                'role': last_editor.get('role')
-            } if last_editor else None
+            'creation_date': get('creationDate'),
+            'last_activity_date': get('lastActivityDate'),
+            'score': get('score', 0),
+            'view_count': get('viewCount', 0),
+            'web_url': get('webUrl'),
+            'share_url': get('shareUrl'),
+            'is_deleted': get('isDeleted', False),
+            'is_obsolete': get('isObsolete', False),
+            'is_closed': get('isClosed', False),
+            'owner': format_user_reference(owner),
+            'last_editor': format_user_reference(last_editor) if last_editor else None
         }
         processed_articles.append(article_data)
+        
+        # Accumulate the article metrics while the record is at hand
+        total_article_views += article_data['view_count']
+        total_article_score += article_data['score']
     
-    return processed_articles
+    return processed_articles, total_article_views, total_article_score
 
 def process_user_data(user: Dict, user_details: Dict, user_questions: List[Dict], 
                      user_answers: List[Dict], user_articles: List[Dict], 
-                     accepted_answers: Dict[int, Dict], all_sme_data: Dict[int, List[int]]) -> Dict:
+                     accepted_answers: Dict[int, Dict], user_sme_tags: Dict[int, List[str]],
+                     last_updated: str, collection_timestamp: str) -> Dict:
     """Process a single user into user-centric format with all their questions, answers, and articles"""
     try:
         if not user:
@@ -933,21 +894,31 @@ def process_user_data(user: Dict, user_details: Dict, user_questions: List[Dict]
         account_longevity = calculate_account_longevity(creation_date)
         
         # Get SME tags
-        sme_tags = get_user_sme_tags(user_id, all_sme_data)
+        sme_tags = user_sme_tags.get(user_id, [])
         is_sme = len(sme_tags) > 0
         
         # Convert epoch timestamps to UTC format
         creation_date_utc = convert_epoch_to_utc_timestamp(creation_date)
         last_login_date_utc = convert_epoch_to_utc_timestamp(detailed_info.get('last_access_date'))
         
-        # Process user's questions with their answers
+        # Process user's questions with their answers, counting the question metrics in the same pass
         processed_questions = []
+        questions_with_accepted_answers = 0
+        unanswered_questions = 0
+        total_question_score = 0
         for question in user_questions:
-            question_id = question.get('id')
+            get = question.get
+            question_id = get('id')
+            
+            if get('hasAcceptedAnswer', False):
+                questions_with_accepted_answers += 1
+            if not get('isAnswered', False):
+                unanswered_questions += 1
+            total_question_score += get('score', 0)
             
             # Get question tags
             question_tags = []
-            for tag in question.get('tags', []):
+            for tag in get('tags', []):
                 if isinstance(tag, dict):
                     question_tags.append(tag.get('name', ''))
                 else:
@@ -973,41 +944,34 @@ def process_user_data(user: Dict, user_details: Dict, user_questions: List[Dict]
                 }
             
             # Get answers for this question (raw format - these are answers BY this user TO other questions)
-            # question_answers = [answer for answer in user_answers if answer.get('questionId') == question_id]
+            # If re-enabled, group user_answers by questionId once before this loop instead of scanning them per question:
+            # question_answers = answers_by_question_id.get(question_id, [])
             
             question_data = {
                 'question_id': question_id,
-                'title': question.get('title'),
+                'title': get('title'),
                 'tags': question_tags,
-                'creation_date': question.get('creationDate'),
-                'score': question.get('score', 0),
-                'view_count': question.get('viewCount', 0),
-                'answer_count': question.get('answerCount', 0),
-                'is_answered': question.get('isAnswered', "Not retrieved"),
+                'creation_date': get('creationDate'),
+                'score': get('score', 0),
+                'view_count': get('viewCount', 0),
+                'answer_count': get('answerCount', 0),
+                'is_answered': get('isAnswered', "Not retrieved"),
                 'has_accepted_answer': bool(accepted_answer_data),
                 'accepted_answer': accepted_answer_data,
                 # 'answers': question_answers  # These are answers TO this question BY this user
             }
             processed_questions.append(question_data)
         
-        # Process user's articles
-        processed_articles = process_articles_data(user_articles)
+        # Process user's articles, with their metrics. Most users in a broad date range have no activity,
+        # so the processors are skipped entirely for them; the record keeps the same shape either way
+        processed_articles, total_article_views, total_article_score = (
+            process_articles_data(user_articles) if user_articles else ([], 0, 0)
+        )
         
-        # Process user's answers (all answers BY this user)
-        processed_answers = process_answers_data(user_answers)
-        
-        # Calculate user metrics
-        questions_with_accepted_answers = len([q for q in user_questions if q.get('hasAcceptedAnswer', False)])
-        unanswered_questions = len([q for q in user_questions if not q.get('isAnswered', False)])
-        
-        # Calculate article metrics
-        total_article_views = sum(article.get('view_count', 0) for article in processed_articles)
-        total_article_score = sum(article.get('score', 0) for article in processed_articles)
-        
-        # Calculate answer metrics
-        total_question_score = sum(question.get('score', 0) for question in user_questions)
-        total_answer_score = sum(answer.get('score', 0) for answer in processed_answers)
-        accepted_answers_given = len([answer for answer in processed_answers if answer.get('is_accepted', False)])
+        # Process user's answers (all answers BY this user), with their metrics
+        processed_answers, total_answer_score, accepted_answers_given = (
+            process_answers_data(user_answers) if user_answers else ([], 0, 0)
+        )
         
         # Build user-centric data
         user_data = {
@@ -1055,8 +1019,8 @@ def process_user_data(user: Dict, user_details: Dict, user_questions: List[Dict]
             'Answers': processed_answers,
             
             # Metadata
-            'Last_Updated': datetime.now().isoformat(),
-            'Data_Collection_Timestamp': convert_epoch_to_utc_timestamp(datetime.now().timestamp())
+            'Last_Updated': last_updated,
+            'Data_Collection_Timestamp': collection_timestamp
         }
         
         return user_data
@@ -1065,9 +1029,16 @@ def process_user_data(user: Dict, user_details: Dict, user_questions: List[Dict]
         log(f"Unexpected error in process_user_data for user {user.get('id') if user else 'None'}: {str(e)}")
         return None
 
-async def collect_powerbi_data() -> List[Dict]:
-    """Main async function to collect user-centric PowerBI data including articles"""
-    global RATE_LIMITER
+def process_user_data_worker(chunk: List[tuple]) -> List[Optional[Dict]]:
+    """ProcessPoolExecutor entry point running process_user_data over a chunk of users"""
+    return [process_user_data(*args) for args in chunk]
+
+async def collect_powerbi_data(session: aiohttp.ClientSession, record_writer: "NDJSONWriter" = None) -> List[Dict]:
+    """
+    Main async function to collect user-centric PowerBI data including articles.
+    With a record_writer each user is written out as soon as it's processed and the returned list stays empty
+    """
+    global CONCURRENCY_LIMITER, RATE_LIMITER
     
     filter_message = ""
     if CONFIG.get('from_date') and CONFIG.get('to_date'):
@@ -1077,265 +1048,246 @@ async def collect_powerbi_data() -> List[Dict]:
     
     log(f"Starting user-centric PowerBI data collection with articles{filter_message}")
     
-    # Initialize rate limiter
-    RATE_LIMITER = asyncio.Semaphore(BURST_LIMIT_REQUESTS)
-    
-    # Create aiohttp session
-    headers = CONFIG['headers']
-    timeout = aiohttp.ClientTimeout(total=300)  # 5 minute timeout
-    
-    async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
-        # Step 1: Get users created in the specified timeframe
-        stop_event = threading.Event()
-        loading_message = f"Fetching users{filter_message}..."
-        loading_thread = threading.Thread(target=loading_animation, args=(stop_event, loading_message))
-        
-        if not VERBOSE:
-            loading_thread.start()
-        
-        try:
-            users_in_timeframe = await get_users_created_in_timeframe(session)
-        finally:
-            stop_event.set()
-            if not VERBOSE:
-                loading_thread.join()
-                print("\rUsers retrieval complete!        ")
-        
-        if not users_in_timeframe:
-            log("No users found in the specified timeframe")
-            return []
-        
-        log(f"Retrieved {len(users_in_timeframe)} users{filter_message}")
-        
-        # Step 2: Get all questions for each user
-        stop_event = threading.Event()
-        loading_message = f"Fetching questions for {len(users_in_timeframe)} users..."
-        loading_thread = threading.Thread(target=loading_animation, args=(stop_event, loading_message))
-        
-        if not VERBOSE:
-            loading_thread.start()
-        
-        try:
-            all_user_questions = {}
-            all_questions = []
-            
-            # Create semaphore for concurrent user question requests
-            concurrent_limit = min(10, BURST_LIMIT_REQUESTS // 4)
-            semaphore = asyncio.Semaphore(concurrent_limit)
+    # Initialize concurrency and rate limiters
+    CONCURRENCY_LIMITER = asyncio.Semaphore(CONFIG.get('max_concurrency', BURST_LIMIT_REQUESTS))
+    RATE_LIMITER = RateLimiter(BURST_LIMIT_REQUESTS, BURST_LIMIT_WINDOW)
+    
+    # Step 1: Get users created in the specified timeframe
+    async with loading_spinner(f"Fetching users{filter_message}...", "Users retrieval complete!"):
+        users_in_timeframe = await get_users_created_in_timeframe(session)
+    
+    if not users_in_timeframe:
+        log("No users found in the specified timeframe")
+        return []
+    
+    log(f"Retrieved {len(users_in_timeframe)} users{filter_message}")
+    
+    # Tag id -> name for every tag seen on questions and articles, harvested as each user's posts arrive
+    # for the Step 7 SME lookup
+    tag_names = {}
+    user_ids = [user.get('id') for user in users_in_timeframe if user.get('id')]
+    
+    # Step 2: Get all questions for each user
+    async with loading_spinner(f"Fetching questions for {len(users_in_timeframe)} users...", "Questions retrieval complete!"):
+        all_user_questions = {}
+        all_questions = []
+        
+        # Create semaphore for concurrent user question requests
+        concurrent_limit = min(10, BURST_LIMIT_REQUESTS // 4)
+        semaphore = asyncio.Semaphore(concurrent_limit)
+        
+        async def fetch_questions_for_user(user_id):
+            async with semaphore:
+                try:
+                    return user_id, await get_questions_for_user(session, user_id)
+                except Exception as e:
+                    log(f"Error fetching questions for user {user_id}: {str(e)}")
+                    return user_id, []
+        
+        # Start every user at once; the semaphore alone bounds how many run concurrently. Each user's questions
+        # are recorded as soon as they arrive, so that work overlaps the requests still in flight
+        for done, finished in enumerate(asyncio.as_completed([fetch_questions_for_user(user_id) for user_id in user_ids]), 1):
+            user_id, questions = await finished
+            all_user_questions[user_id] = questions
+            all_questions.extend(questions)
+            collect_post_tags(questions, tag_names)
             
-            async def fetch_questions_for_user(user):
-                async with semaphore:
-                    user_id = user.get('id')
-                    if not user_id:
-                        return
-                    
-                    try:
-                        questions = await get_questions_for_user(session, user_id)
-                        all_user_questions[user_id] = questions
-                        all_questions.extend(questions)
-                    except Exception as e:
-                        log(f"Error fetching questions for user {user_id}: {str(e)}")
-                        all_user_questions[user_id] = []
+            if done % 50 == 0 or done == len(user_ids):
+                log(f"Processed questions for {done}/{len(user_ids)} users")
+    
+    log(f"Retrieved {len(all_questions)} total questions from {len(users_in_timeframe)} users")
+    
+    # Step 3: Get all articles for each user
+    async with loading_spinner(f"Fetching articles for {len(users_in_timeframe)} users...", "Articles retrieval complete!"):
+        all_user_articles = {}
+        all_articles = []
+        
+        async def fetch_articles_for_user(user_id):
+            async with semaphore:
+                try:
+                    return user_id, await get_articles_for_user(session, user_id)
+                except Exception as e:
+                    log(f"Error fetching articles for user {user_id}: {str(e)}")
+                    return user_id, []
+        
+        # Start every user at once; the semaphore alone bounds how many run concurrently
+        for done, finished in enumerate(asyncio.as_completed([fetch_articles_for_user(user_id) for user_id in user_ids]), 1):
+            user_id, articles = await finished
+            all_user_articles[user_id] = articles
+            all_articles.extend(articles)
+            collect_post_tags(articles, tag_names)
             
-            # Process users in batches
-            batch_size = 20
-            for i in range(0, len(users_in_timeframe), batch_size):
-                batch = users_in_timeframe[i:i + batch_size]
-                tasks = [fetch_questions_for_user(user) for user in batch]
-                await asyncio.gather(*tasks, return_exceptions=True)
-                
-                log(f"Processed questions for batch {i//batch_size + 1}/{(len(users_in_timeframe) + batch_size - 1)//batch_size}")
-                await asyncio.sleep(0.5)  # Small delay between batches
-                
-        finally:
-            stop_event.set()
-            if not VERBOSE:
-                loading_thread.join()
-                print("\rQuestions retrieval complete!        ")
-        
-        log(f"Retrieved {len(all_questions)} total questions from {len(users_in_timeframe)} users")
-        
-        # Step 3: Get all articles for each user
-        stop_event = threading.Event()
-        loading_message = f"Fetching articles for {len(users_in_timeframe)} users..."
-        loading_thread = threading.Thread(target=loading_animation, args=(stop_event, loading_message))
-        
-        if not VERBOSE:
-            loading_thread.start()
-        
+            if done % 50 == 0 or done == len(user_ids):
+                log(f"Processed articles for {done}/{len(user_ids)} users")
+    
+    log(f"Retrieved {len(all_articles)} total articles from {len(users_in_timeframe)} users")
+    
+    # Step 4: Get all answers for the questions
+    async with loading_spinner(f"Fetching answers for {len(all_questions)} questions...", "Answers retrieval complete!"):
+        all_answers = await get_answers_for_questions(session, all_questions)
+    
+    # Step 5: Extract accepted answers
+    async with loading_spinner(f"Extracting accepted answers from {len(all_answers)} answers...", "Accepted answers extraction complete!"):
+        accepted_answers = extract_accepted_answers_from_all_answers(all_answers)
+    
+    # Step 6: Get detailed user info for all users
+    async with loading_spinner(f"Fetching detailed info for {len(user_ids)} users...", "User details retrieval complete!"):
+        user_details = await get_user_detailed_info_batch(session, user_ids)
+    
+    # Step 7: Get SME data for all tags (from both questions and articles, collected in Steps 2 and 3)
+    async with loading_spinner(f"Fetching SME data for {len(tag_names)} tags...", "SME data retrieval complete!"):
+        all_sme_data = await get_sme_data_for_tags(session, list(tag_names)) if tag_names else {}
+    
+    user_sme_tags = build_user_sme_tags_index(all_sme_data, tag_names)
+    
+    # Step 8: Group answers by user
+    answers_by_user = defaultdict(list)
+    for answer in all_answers:
+        owner = answer.get('owner')
+        owner_id = owner.get('id') if owner else None  # Looked up once, for both the check and the key
+        if owner_id:
+            answers_by_user[owner_id].append(answer)
+    
+    log(f"Content summary: {len(users_in_timeframe)} users, {len(all_questions)} questions, {len(all_articles)} articles, {len(all_answers)} answers, {len(accepted_answers)} accepted answers")
+    
+    # Only the per-user maps are needed from here on. Dropping the flat lists, and popping each user's raw API
+    # objects as their record is built, lets those objects be freed while the processed records accumulate,
+    # so peak memory is closer to the larger of the two than to their sum
+    del all_questions, all_articles, all_answers
+    
+    # Step 9: Process all users into user-centric format
+    log(f"Processing {len(users_in_timeframe)} users")
+    
+    # Every record shares the same collection time, so it's worked out once rather than per user.
+    # Both fields come from a single time.time() reading so they always describe the same instant
+    collected_at = time.time()
+    last_updated = datetime.fromtimestamp(collected_at).isoformat()
+    collection_timestamp = convert_epoch_to_utc_timestamp(collected_at)
+    
+    users_to_process = [user for user in users_in_timeframe if user.get('id')]
+    USER_REFERENCE_CACHE.clear()  # Owner/editor details may have changed since the last scheduled run
+    
+    powerbi_data = []
+    processed = 0
+    
+    def emit_record(user: Dict, user_data: Optional[Dict]):
+        nonlocal processed
+        processed += 1
         try:
-            all_user_articles = {}
-            all_articles = []
-            
-            async def fetch_articles_for_user(user):
-                async with semaphore:
-                    user_id = user.get('id')
-                    if not user_id:
-                        return
-                    
-                    try:
-                        articles = await get_articles_for_user(session, user_id)
-                        all_user_articles[user_id] = articles
-                        all_articles.extend(articles)
-                    except Exception as e:
-                        log(f"Error fetching articles for user {user_id}: {str(e)}")
-                        all_user_articles[user_id] = []
-            
-            # Process users in batches
-            for i in range(0, len(users_in_timeframe), batch_size):
-                batch = users_in_timeframe[i:i + batch_size]
-                tasks = [fetch_articles_for_user(user) for user in batch]
-                await asyncio.gather(*tasks, return_exceptions=True)
+            if user_data:
+                if record_writer is not None:
+                    record_writer.write(user_data)
+                else:
+                    powerbi_data.append(user_data)
                 
-                log(f"Processed articles for batch {i//batch_size + 1}/{(len(users_in_timeframe) + batch_size - 1)//batch_size}")
-                await asyncio.sleep(0.5)  # Small delay between batches
+            if processed % 50 == 0 or processed == len(users_to_process):
+                log(f"Processed {processed}/{len(users_to_process)} users")
                 
-        finally:
-            stop_event.set()
-            if not VERBOSE:
-                loading_thread.join()
-                print("\rArticles retrieval complete!        ")
-        
-        log(f"Retrieved {len(all_articles)} total articles from {len(users_in_timeframe)} users")
-        
-        # Step 4: Get all answers for the questions
-        stop_event = threading.Event()
-        loading_message = f"Fetching answers for {len(all_questions)} questions..."
-        loading_thread = threading.Thread(target=loading_animation, args=(stop_event, loading_message))
-        
-        if not VERBOSE:
-            loading_thread.start()
-        
-        try:
-            all_answers = await get_answers_for_questions(session, all_questions)
-        finally:
-            stop_event.set()
-            if not VERBOSE:
-                loading_thread.join()
-                print("\rAnswers retrieval complete!        ")
-        
-        # Step 5: Extract accepted answers
-        stop_event = threading.Event()
-        loading_message = f"Extracting accepted answers from {len(all_answers)} answers..."
-        loading_thread = threading.Thread(target=loading_animation, args=(stop_event, loading_message))
-        
-        if not VERBOSE:
-            loading_thread.start()
-        
-        try:
-            accepted_answers = extract_accepted_answers_from_all_answers(all_answers)
-        finally:
-            stop_event.set()
-            if not VERBOSE:
-                loading_thread.join()
-                print("\rAccepted answers extraction complete!        ")
-        
-        # Step 6: Get detailed user info for all users
-        user_ids = [user.get('id') for user in users_in_timeframe if user.get('id')]
-        
-        stop_event = threading.Event()
-        loading_message = f"Fetching detailed info for {len(user_ids)} users..."
-        loading_thread = threading.Thread(target=loading_animation, args=(stop_event, loading_message))
-        
-        if not VERBOSE:
-            loading_thread.start()
-        
-        try:
-            user_details = await get_user_detailed_info_batch(session, user_ids)
-        finally:
-            stop_event.set()
-            if not VERBOSE:
-                loading_thread.join()
-                print("\rUser details retrieval complete!        ")
-        
-        # Step 7: Get SME data for all tags (from both questions and articles)
-        all_tag_ids = set()
-        
-        # Get tags from questions
-        for questions in all_user_questions.values():
-            for question in questions:
-                for tag in question.get('tags', []):
-                    if isinstance(tag, dict) and tag.get('id'):
-                        all_tag_ids.add(tag.get('id'))
-                        # Cache tag name for later use
-                        SME_CACHE[tag.get('id')] = tag.get('name', f"tag_{tag.get('id')}")
-        
-        # Get tags from articles
-        for articles in all_user_articles.values():
-            for article in articles:
-                for tag in article.get('tags', []):
-                    if isinstance(tag, dict) and tag.get('id'):
-                        all_tag_ids.add(tag.get('id'))
-                        # Cache tag name for later use
-                        SME_CACHE[tag.get('id')] = tag.get('name', f"tag_{tag.get('id')}")
-        
-        stop_event = threading.Event()
-        loading_message = f"Fetching SME data for {len(all_tag_ids)} tags..."
-        loading_thread = threading.Thread(target=loading_animation, args=(stop_event, loading_message))
-        
-        if not VERBOSE:
-            loading_thread.start()
+        except Exception as e:
+            log(f"Error processing user {user.get('id')}: {str(e)}")
+    
+    if len(users_to_process) >= PROCESS_POOL_MIN_USERS:
+        # All I/O is done and the rest is CPU-bound, so spread it over worker processes. Each worker gets
+        # only its own user's slice of the shared lookups rather than a pickled copy of all of them
+        def worker_args(user: Dict) -> tuple:
+            user_id = user['id']
+            user_questions = all_user_questions.pop(user_id, [])
+            return (
+                user,
+                {user_id: user_details[user_id]} if user_id in user_details else {},
+                user_questions,
+                answers_by_user.pop(user_id, []),
+                all_user_articles.pop(user_id, []),
+                {q['id']: accepted_answers[q['id']] for q in user_questions if q.get('id') in accepted_answers},
+                {user_id: user_sme_tags[user_id]} if user_id in user_sme_tags else {},
+                last_updated,
+                collection_timestamp
+            )
+        
+        # Imported here because pulling in multiprocessing is a noticeable share of startup and only large runs need it
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        
+        max_workers = os.cpu_count() or 1
+        # Spawned rather than forked: forking a process that is running an event loop (and aiohttp's
+        # threads) can deadlock the children on locks that were held at the time of the fork
+        executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        chunk_size = 32
+        pending = deque()  # (chunk, future) in submission order
+        
+        async def emit_chunk(chunk: List[Dict], future):
+            # The event loop stays free for signal handlers while the workers are busy
+            for user, user_data in zip(chunk, await asyncio.wrap_future(future)):
+                emit_record(user, user_data)
         
         try:
-            all_sme_data = await get_sme_data_for_tags(session, list(all_tag_ids)) if all_tag_ids else {}
+            # At most two chunks per worker are outstanding, so a user's posts are only pulled out of the shared
+            # maps shortly before a worker is free for them, and each chunk is written out (in order) as it's ready
+            for start in range(0, len(users_to_process), chunk_size):
+                chunk = users_to_process[start:start + chunk_size]
+                pending.append((chunk, executor.submit(process_user_data_worker, [worker_args(user) for user in chunk])))
+                if len(pending) >= max_workers * 2:
+                    await emit_chunk(*pending.popleft())
+            while pending:
+                await emit_chunk(*pending.popleft())
         finally:
-            stop_event.set()
-            if not VERBOSE:
-                loading_thread.join()
-                print("\rSME data retrieval complete!        ")
-        
-        # Step 8: Group answers by user
-        answers_by_user = defaultdict(list)
-        for answer in all_answers:
-            owner = answer.get('owner')
-            if owner and owner.get('id'):
-                answers_by_user[owner.get('id')].append(answer)
-        
-        log(f"Content summary: {len(users_in_timeframe)} users, {len(all_questions)} questions, {len(all_articles)} articles, {len(all_answers)} answers, {len(accepted_answers)} accepted answers")
-        
-        # Step 9: Process all users into user-centric format
-        log(f"Processing {len(users_in_timeframe)} users")
-        
-        powerbi_data = []
-        for i, user in enumerate(users_in_timeframe, 1):
-            try:
-                user_id = user.get('id')
-                if not user_id:
-                    continue
-                
-                user_questions = all_user_questions.get(user_id, [])
-                user_articles = all_user_articles.get(user_id, [])
-                user_answers = answers_by_user.get(user_id, [])
-                
-                user_data = process_user_data(
-                    user, user_details, user_questions, user_answers, user_articles,
-                    accepted_answers, all_sme_data
-                )
-                
-                if user_data:
-                    powerbi_data.append(user_data)
-                    
-                if i % 50 == 0 or i == len(users_in_timeframe):
-                    log(f"Processed {i}/{len(users_in_timeframe)} users")
-                    
-            except Exception as e:
-                log(f"Error processing user {user.get('id')}: {str(e)}")
-        
-        log(f"Collected user-centric data for {len(powerbi_data)} users")
-        
-        return powerbi_data
+            for _, future in pending:
+                future.cancel()
+            # Shut down off the event loop thread, which would otherwise block until the workers exit
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+    else:
+        for user in users_to_process:
+            emit_record(user, process_user_data(
+                user, user_details, all_user_questions.pop(user['id'], []), answers_by_user.pop(user['id'], []),
+                all_user_articles.pop(user['id'], []), accepted_answers, user_sme_tags, last_updated, collection_timestamp
+            ))
+    
+    log(f"Collected user-centric data for {record_writer.users if record_writer is not None else len(powerbi_data)} users")
+    
+    return powerbi_data
+
+def default_output_filename(extension: str = "json") -> str:
+    """Auto-generated output filename based on the collection scope"""
+    # The date range part is fixed for the life of the process and built once in main(); only "all" needs a timestamp
+    if CONFIG.get('output_range_tag'):
+        return f"powerbi_users_with_articles_{CONFIG['output_range_tag']}.{extension}"
+    return f"powerbi_users_with_articles_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+
+class NDJSONWriter:
+    """Write one user record per line as it's produced, keeping only the running totals for the summary"""
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.file = open(filename, 'wb')
+        self.users = 0
+        self.questions = 0
+        self.articles = 0
+    
+    def write(self, user_data: Dict):
+        if orjson is not None:
+            line = orjson.dumps(user_data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE, default=str)
+        else:
+            line = (json.dumps(user_data, ensure_ascii=False, default=str) + "\n").encode('utf-8')
+        self.file.write(line)
+        self.users += 1
+        self.questions += len(user_data.get('Questions', []))
+        self.articles += len(user_data.get('Articles', []))
+    
+    def close(self):
+        self.file.close()
 
 def save_data_to_json(data: List[Dict], filename: str = None):
     """Save collected data to JSON file"""
     if not filename:
-        if CONFIG.get('from_date') and CONFIG.get('to_date'):
-            filename = f"powerbi_users_with_articles_{CONFIG['from_date']}_to_{CONFIG['to_date']}.json"
-        else:
-            filename = f"powerbi_users_with_articles_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        filename = default_output_filename()
     
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+        if orjson is not None:
+            # orjson writes UTF-8 bytes directly, so the file is opened in binary mode
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str))
+        else:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
         
         log(f"Data saved to {filename}")
         return filename
@@ -1344,8 +1296,8 @@ def save_data_to_json(data: List[Dict], filename: str = None):
         log(f"Error saving data to JSON: {str(e)}")
         raise
 
-async def export_powerbi_data():
-    """Main async export function for cron job"""
+async def export_powerbi_data(session: aiohttp.ClientSession) -> bool:
+    """Main async export function for cron job. Returns whether an export was written"""
     global API_V2_CALLS, API_V3_CALLS
     
     start_time = datetime.now()
@@ -1367,50 +1319,190 @@ async def export_powerbi_data():
     API_V3_CALLS = 0
     
     try:
-        # Collect all data efficiently using async
-        powerbi_data = await collect_powerbi_data()
-        
-        if not powerbi_data:
-            log("No data collected")
-            return
-        
-        # Save to JSON file
-        filename = CONFIG.get('output_file')
-        filename = save_data_to_json(powerbi_data, filename)
+        if CONFIG.get('output_format') == 'ndjson':
+            # Stream each user to the file as it's processed instead of holding them all in memory
+            filename = CONFIG.get('output_file') or default_output_filename("ndjson")
+            record_writer = NDJSONWriter(filename)
+            try:
+                await collect_powerbi_data(session, record_writer)
+            finally:
+                record_writer.close()
+            
+            if not record_writer.users:
+                os.remove(filename)
+                log("No data collected")
+                return False
+            
+            log(f"Data saved to {filename}")
+            total_users = record_writer.users
+            total_questions = record_writer.questions
+            total_articles = record_writer.articles
+        else:
+            # Collect all data efficiently using async
+            powerbi_data = await collect_powerbi_data(session)
+            
+            if not powerbi_data:
+                log("No data collected")
+                return False
+            
+            # Save to JSON file
+            filename = CONFIG.get('output_file')
+            filename = save_data_to_json(powerbi_data, filename)
+            
+            # Calculate totals
+            total_users = len(powerbi_data)
+            total_questions = sum(len(user_data.get('Questions', [])) for user_data in powerbi_data)
+            total_articles = sum(len(user_data.get('Articles', [])) for user_data in powerbi_data)
         
         end_time = datetime.now()
         duration = end_time - start_time
         
-        # Calculate totals
-        total_questions = sum(len(user_data.get('Questions', [])) for user_data in powerbi_data)
-        total_articles = sum(len(user_data.get('Articles', [])) for user_data in powerbi_data)
-        
         # Print summary
         print(f"\n✅ User-centric PowerBI data export with articles complete!")
         print(f"   Data saved to: {filename}")
-        print(f"   Total users processed{filter_message}: {len(powerbi_data)}")
+        print(f"   Total users processed{filter_message}: {total_users}")
         print(f"   Total questions collected: {total_questions}")
         print(f"   Total articles collected: {total_articles}")
         print(f"   Total time: {duration}")
         print(f"   Total API v3 calls: {API_V3_CALLS}")
         print(f"   Total API v2.3 calls: {API_V2_CALLS}")
         print(f"   Total API calls: {API_V3_CALLS + API_V2_CALLS}")
-        if len(powerbi_data) > 0:
-            print(f"   Average time per user: {duration.total_seconds() / len(powerbi_data):.3f}s")
+        if total_users > 0:
+            print(f"   Average time per user: {duration.total_seconds() / total_users:.3f}s")
         
         log(f"Export completed successfully in {duration}")
+        return True
         
     except Exception as e:
         log(f"Export failed: {str(e)}")
         raise
 
-def run_cron_job():
-    """Run the scheduled job"""
+async def run_cron_job(session: aiohttp.ClientSession) -> bool:
+    """Run the scheduled job. Returns whether an export was written"""
     if not RUNNING:
-        return
+        return False
         
     log("Running scheduled user-centric PowerBI data collection with articles")
-    asyncio.run(export_powerbi_data())
+    return await export_powerbi_data(session)
+
+class CronSchedule:
+    """A five-field cron expression (minute hour day month weekday) supporting *, ranges, lists and /steps"""
+    
+    FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+    
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"expected 5 fields, got {len(fields)}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, self.FIELD_RANGES)
+        )
+        if 7 in self.weekdays:
+            self.weekdays.add(0)  # Both 0 and 7 mean Sunday
+        # As in cron, when both day fields are restricted a day matching either one fires
+        self.day_or_weekday = not fields[2].startswith('*') and not fields[4].startswith('*')
+        self.times = sorted((hour, minute) for hour in self.hours for minute in self.minutes)
+        self.next_run(datetime.now())  # Reject expressions that can never fire, such as "0 0 31 2 *"
+    
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        values = set()
+        for part in field.split(','):
+            part, _, step = part.partition('/')
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = (int(bound) for bound in part.split('-', 1))
+            else:
+                start = int(part)
+                end = high if step else start
+            step = int(step) if step else 1
+            if not low <= start <= end <= high or step < 1:
+                raise ValueError(f"'{field}' is not a valid range within {low}-{high}")
+            values.update(range(start, end + 1, step))
+        return values
+    
+    def _day_matches(self, day: datetime) -> bool:
+        if day.month not in self.months:
+            return False
+        day_match = day.day in self.days
+        weekday_match = (day.weekday() + 1) % 7 in self.weekdays  # cron counts from Sunday = 0
+        if self.day_or_weekday:
+            return day_match or weekday_match
+        return day_match and weekday_match
+    
+    def next_run(self, after: datetime) -> datetime:
+        """The first minute strictly after `after` that the schedule fires on"""
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        # Stepping by day rather than by minute keeps this cheap; five years covers every leap-day schedule
+        for _ in range(366 * 5):
+            if self._day_matches(day):
+                for hour, minute in self.times:
+                    run = day.replace(hour=hour, minute=minute)
+                    if run >= start:
+                        return run
+            day += timedelta(days=1)
+        raise ValueError(f"'{self.expression}' never fires")
+
+async def sleep_until(when: datetime, max_slice: float = 60.0):
+    """
+    Sleep until the local wall-clock time `when`. The monotonic clock asyncio sleeps on doesn't follow DST
+    changes or time spent suspended, so the wall clock is rechecked at least every max_slice seconds
+    """
+    while True:
+        remaining = (when - datetime.now()).total_seconds()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(min(remaining, max_slice))
+
+async def run_once():
+    """Run the export a single time"""
+    async with create_session() as session:
+        await export_powerbi_data(session)
+
+def load_last_run(state_file: str) -> Optional[datetime]:
+    """When the last scheduled export started, as recorded in state_file, or None if there's no usable record"""
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return datetime.fromtimestamp(json.load(f)['last_run'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def save_last_run(state_file: str, started: datetime):
+    """Record when the last scheduled export started. Written to a temp file and renamed, so a crash can't corrupt it"""
+    temp_file = f"{state_file}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump({'last_run': started.timestamp()}, f)
+    os.replace(temp_file, state_file)
+
+async def run_scheduled(schedule: CronSchedule, state_file: str = None):
+    """
+    Run the export immediately, then whenever the cron schedule fires until shutdown.
+    With a state_file the time of each successful run survives restarts, and the immediate run only happens
+    if the schedule fired since the last one
+    """
+    # One session for the life of the process, so runs close together reuse its pooled connections and DNS cache
+    async with create_session() as session:
+        last_run = load_last_run(state_file) if state_file else None
+        if last_run is None or schedule.next_run(last_run) <= datetime.now():
+            # Run once immediately
+            logger.info("Running initial data collection...")
+            started = datetime.now()
+            # Only a run that wrote an export counts, so a restart after a failed one catches up
+            if await export_powerbi_data(session) and state_file:
+                save_last_run(state_file, started)
+        else:
+            logger.info("Skipping initial data collection, the last run at %s is still current", last_run)
+        
+        logger.info("Starting scheduler...")
+        while RUNNING:
+            # Recomputed after every run, so an export that overruns a fire time just runs once at the next one
+            await sleep_until(schedule.next_run(datetime.now()))
+            started = datetime.now()
+            if await run_cron_job(session) and state_file:
+                save_last_run(state_file, started)
 
 def main():
     global CONFIG, VERBOSE, logger
@@ -1427,12 +1519,18 @@ def main():
                        help="Team slug (required for Teams instances, auto-detected if not provided)")
     parser.add_argument("--output-file",
                        help="Output JSON filename (auto-generated if not specified)")
+    parser.add_argument("--format", choices=["json", "ndjson"], default="json",
+                       help="Output format: a single JSON array, or one JSON user record per line written as users are processed (default: json)")
+    parser.add_argument("--max-concurrency", type=int, default=BURST_LIMIT_REQUESTS,
+                       help=f"Maximum API requests in flight at once (default: {BURST_LIMIT_REQUESTS})")
     parser.add_argument("--verbose", "-v", action="store_true",
                        help="Enable verbose output")
     parser.add_argument("--run-once", action="store_true",
                        help="Run once and exit (no cron job)")
     parser.add_argument("--cron-schedule", default="0 2 * * *",
                        help="Cron schedule (default: daily at 2 AM)")
+    parser.add_argument("--state-file",
+                       help="File recording the last successful scheduled run, so a restart skips the initial run if the schedule hasn't fired since")
     
     # Time filtering options
     parser.add_argument("--filter", choices=["week", "month", "quarter", "year", "custom", "none"], 
@@ -1447,16 +1545,17 @@ def main():
     
     # Validate custom filter arguments
     if args.filter == "custom" and (not args.from_date or not args.to_date):
-        print("Error: --from-date and --to-date are required when using --filter=custom")
-        sys.exit(1)
+        parser.error("--from-date and --to-date are required when using --filter=custom")
     
-    # Setup logging
-    VERBOSE = args.verbose
-    logger = setup_logging(VERBOSE)
+    if args.max_concurrency < 1:
+        parser.error("--max-concurrency must be at least 1")
     
-    # Setup signal handlers
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # Parse the cron schedule once, up front, so a typo fails now rather than at the first scheduled run
+    if not args.run_once:
+        try:
+            schedule = CronSchedule(args.cron_schedule)
+        except ValueError as e:
+            parser.error(f"invalid --cron-schedule '{args.cron_schedule}': {e}")
     
     # Get date range based on filter
     if args.filter == "custom":
@@ -1471,76 +1570,93 @@ def main():
         from_date, to_date = get_date_range(args.filter)
         filter_type = args.filter
     
+    # Convert the dates to epoch bounds once, so a malformed --from-date/--to-date fails now rather than mid-collection
+    from_epoch = None
+    to_epoch = None
+    if from_date and to_date:
+        try:
+            from_epoch = convert_date_to_epoch(from_date)
+            to_epoch = convert_date_to_epoch(to_date) + 86400  # Add 24 hours to include end date
+        except ValueError as e:
+            parser.error(f"dates must be in YYYY-MM-DD format ({e})")
+    
     # Build API URLs and detect instance type
     try:
         api_v3_base, api_v2_base, instance_type = build_api_urls(args.base_url, args.team_slug)
     except ValueError as e:
-        print(f"Error: {e}")
-        sys.exit(1)
+        parser.error(str(e))
+    
+    # The header is built once and attached to the session, so check it here rather than on the first request
+    auth_header = f'Bearer {args.token}'
+    if not (auth_header.isascii() and auth_header.isprintable()):
+        parser.error("--token must contain only printable ASCII characters")
+    
+    # Every argument is valid; only now set up logging and the event loop
+    VERBOSE = args.verbose
+    logger = setup_logging(VERBOSE)
+    
+    # Use uvloop for every asyncio.run below when it's installed
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     
     # Setup global configuration
     CONFIG.update({
         'api_v3_base': api_v3_base,
         'api_v2_base': api_v2_base,
-        'headers': {'Authorization': f'Bearer {args.token}',
+        'headers': {'Authorization': auth_header,
                     'User-Agent': 'powerbi_collector / 1.0'},
         'output_file': args.output_file,
+        'output_format': args.format,
+        'max_concurrency': args.max_concurrency,
         'from_date': from_date,
         'to_date': to_date,
+        'from_epoch': from_epoch,
+        'to_epoch': to_epoch,
+        'output_range_tag': f"{from_date}_to_{to_date}" if from_date and to_date else None,
         'filter_type': filter_type,
         'instance_type': instance_type,
         'team_slug': args.team_slug
     })
     
+    # Parameters shared by every API v2.3 call, built once with None values dropped
+    v2_base_params = {
+        "key": CONFIG.get("api_key"),
+        "access_token": CONFIG.get("token"),
+        "team": args.team_slug if instance_type == "teams" else None
+    }
+    CONFIG['v2_base_params'] = {k: v for k, v in v2_base_params.items() if v is not None}
+    CONFIG['v2_users_url_prefix'] = f"{api_v2_base}/users/"
+    
     # Create filter description for logging
-    filter_desc = "all users"
-    if filter_type and filter_type != "none":
-        if filter_type == "custom":
-            filter_desc = f"users created in custom date range ({from_date} to {to_date})"
-        else:
-            filter_desc = f"users created in the last {filter_type} ({from_date} to {to_date})"
-    
-    logger.info(f"Universal Async User-Centric PowerBI Data Collector with Articles starting...")
-    logger.info(f"Instance type: {instance_type.title()}")
-    logger.info(f"API v3 Base URL: {CONFIG['api_v3_base']}")
-    logger.info(f"API v2.3 Base URL: {CONFIG['api_v2_base']}")
-    logger.info(f"Data collection scope: {filter_desc}")
-    logger.info(f"Data structure: User-centric with all questions and articles per user")
-    if CONFIG.get('output_file'):
-        logger.info(f"Output file: {CONFIG['output_file']}")
+    if filter_type == "none":
+        filter_desc = "all users"
+    elif filter_type == "custom":
+        filter_desc = f"users created in custom date range ({from_date} to {to_date})"
     else:
-        logger.info("Output file: Auto-generated with timestamp and date range")
+        filter_desc = f"users created in the last {filter_type} ({from_date} to {to_date})"
+    
+    # The startup banner goes out as a single log record, formatted by logging only if it's emitted
+    output_file = CONFIG['output_file'] if CONFIG.get('output_file') else "Auto-generated with timestamp and date range"
+    logger.info(
+        "Universal Async User-Centric PowerBI Data Collector with Articles starting...\n"
+        "Instance type: %s\n"
+        "API v3 Base URL: %s\n"
+        "API v2.3 Base URL: %s\n"
+        "Data collection scope: %s\n"
+        "Data structure: User-centric with all questions and articles per user\n"
+        "Output file: %s",
+        instance_type.title(), CONFIG['api_v3_base'], CONFIG['api_v2_base'], filter_desc, output_file
+    )
     
     if args.run_once:
         # Run once and exit
         logger.info("Running data collection once...")
-        asyncio.run(export_powerbi_data())
+        asyncio.run(run_until_shutdown(run_once()))
     else:
         # Setup cron job
-        logger.info(f"Setting up cron job with schedule: {args.cron_schedule}")
-        
-        # Parse cron schedule (simplified - assumes format: minute hour day month day_of_week)
-        cron_parts = args.cron_schedule.split()
-        if len(cron_parts) == 5:
-            minute, hour = cron_parts[0], cron_parts[1]
-            if minute.isdigit() and hour.isdigit():
-                schedule.every().day.at(f"{hour.zfill(2)}:{minute.zfill(2)}").do(run_cron_job)
-            else:
-                logger.warning("Complex cron schedule not supported, using daily at 02:00")
-                schedule.every().day.at("02:00").do(run_cron_job)
-        else:
-            logger.warning("Invalid cron schedule format, using daily at 02:00")
-            schedule.every().day.at("02:00").do(run_cron_job)
-        
-        # Run once immediately
-        logger.info("Running initial data collection...")
-        asyncio.run(export_powerbi_data())
+        logger.info("Setting up cron job with schedule: %s", args.cron_schedule)
         
-        # Start scheduler
-        logger.info("Starting scheduler...")
-        while RUNNING:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+        asyncio.run(run_until_shutdown(run_scheduled(schedule, args.state_file)))
     
     logger.info("Universal Async User-Centric PowerBI Data Collector with Articles stopped")
 
@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+import powerbi_collector
+from powerbi_collector import CronSchedule, sleep_until
+
+
+def test_steps():
+    assert CronSchedule("*/15 * * * *").minutes == {0, 15, 30, 45}
+    assert CronSchedule("5/20 * * * *").minutes == {5, 25, 45}
+    assert CronSchedule("0 9-17/4 * * *").hours == {9, 13, 17}
+
+
+def test_ranges_and_lists():
+    schedule = CronSchedule("0,30 1,3-5 * * *")
+    assert schedule.minutes == {0, 30}
+    assert schedule.hours == {1, 3, 4, 5}
+
+
+@pytest.mark.parametrize("expression", ["60 * * * *", "* 24 * * *", "* * 0 * *", "5-1 * * * *", "*/0 * * * *", "* * *"])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_never_fires():
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 31 2 *")
+
+
+def test_next_run_is_strictly_after():
+    schedule = CronSchedule("0 2 * * *")
+    assert schedule.next_run(datetime(2024, 1, 1, 1, 59, 59)) == datetime(2024, 1, 1, 2, 0)
+    assert schedule.next_run(datetime(2024, 1, 1, 2, 0)) == datetime(2024, 1, 2, 2, 0)
+    assert schedule.next_run(datetime(2024, 1, 1, 2, 0, 30)) == datetime(2024, 1, 2, 2, 0)
+
+
+def test_seven_means_sunday():
+    # 2024-01-01 is a Monday
+    assert CronSchedule("0 0 * * 7").next_run(datetime(2024, 1, 1)) == datetime(2024, 1, 7)
+    assert CronSchedule("0 0 * * 0").next_run(datetime(2024, 1, 1)) == datetime(2024, 1, 7)
+    assert CronSchedule("0 0 * * 5-7").next_run(datetime(2024, 1, 6, 12)) == datetime(2024, 1, 7)
+
+
+def test_day_of_month_or_weekday():
+    # Both fields restricted: the 13th of the month or any Friday
+    schedule = CronSchedule("0 0 13 * 5")
+    assert schedule.next_run(datetime(2024, 1, 1)) == datetime(2024, 1, 5)
+    assert schedule.next_run(datetime(2024, 1, 12)) == datetime(2024, 1, 13)
+
+
+def test_day_of_month_and_wildcard_weekday():
+    # Only the day of month restricted: weekday doesn't widen it
+    assert CronSchedule("0 0 13 * *").next_run(datetime(2024, 1, 1)) == datetime(2024, 1, 13)
+    assert CronSchedule("0 0 */10 * *").next_run(datetime(2024, 1, 1)) == datetime(2024, 1, 11)
+
+
+def test_leap_day():
+    assert CronSchedule("0 0 29 2 *").next_run(datetime(2024, 3, 1)) == datetime(2028, 2, 29)
+
+
+def test_sleep_until_follows_wall_clock(monkeypatch):
+    # The wall clock jumps an hour ahead partway through, as on a DST change or after a suspend
+    clock = [datetime(2024, 3, 31, 0, 0)]
+    slept = []
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock[0]
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        clock[0] += timedelta(seconds=seconds)
+        if len(slept) == 10:
+            clock[0] += timedelta(hours=1)
+
+    monkeypatch.setattr(powerbi_collector, "datetime", FakeDatetime)
+    monkeypatch.setattr(powerbi_collector.asyncio, "sleep", fake_sleep)
+    asyncio.run(sleep_until(datetime(2024, 3, 31, 2, 0)))
+
+    assert clock[0] == datetime(2024, 3, 31, 2, 0)
+    assert max(slept) <= 60
+    assert sum(slept) == 3600